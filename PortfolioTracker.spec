@@ -0,0 +1,150 @@
+# -*- mode: python ; coding: utf-8 -*-
+"""
+PyInstaller spec for the Portfolio Tracker executable.
+Built via build_exe.py; kept under version control so PyInstaller can
+reuse its cached analysis between builds.
+"""
+
+import argparse
+import shutil
+import sys
+
+from PyInstaller.utils.hooks import collect_data_files, collect_submodules
+
+# Options passed by build_exe.py after '--'
+parser = argparse.ArgumentParser()
+parser.add_argument(
+    '--release',
+    action='store_true',
+    help="Build a single-file executable instead of a one-directory dev build",
+)
+options = parser.parse_args()
+
+# Make the project's src package importable for submodule discovery
+sys.path.insert(0, SPECPATH)
+
+# Every src.* module plus Flet's lazily imported modules, discovered at
+# build time instead of hand-listed
+hiddenimports = (
+    collect_submodules('src')
+    + collect_submodules('flet')
+    + [
+        # Imports of modules compiled by compile_cython.py are invisible
+        # to PyInstaller's bytecode scan
+        'base64',
+        'hashlib',
+        'json',
+        'sqlite3',
+        'pydantic',
+        'pydantic_settings',
+        'sqlalchemy',
+        'sqlalchemy.ext.declarative',
+        'sqlalchemy.orm',
+        'sqlalchemy.pool',
+        'cryptography.fernet',
+        'cryptography.hazmat.primitives.kdf.pbkdf2',
+        'sqlalchemy.sql.default_comparator',
+        'cryptography',
+        'bcrypt',
+    ]
+)
+
+# Modules the Flet app never uses; excluding them keeps Analysis short
+# and the executable small
+excludes = [
+    'tkinter',
+    'unittest',
+    'test',
+    'tests',
+    'pandas.tests',
+    'numpy.tests',
+    'matplotlib',
+    'IPython',
+    'jupyter',
+    'notebook',
+    'PyQt5',
+    'PyQt6',
+    'PySide2',
+    'PySide6',
+    'setuptools._vendor',
+    'pip',
+    'distutils',
+]
+
+# Stripping needs binutils' strip (MinGW/MSYS2 on Windows); without it
+# PyInstaller's strip step silently does nothing
+use_strip = shutil.which('strip') is not None
+
+# UPX compression is applied to Windows release builds only (no
+# ARM64/macOS support); these DLLs are known to break when packed
+use_upx = options.release and sys.platform == 'win32'
+upx_exclude = [
+    'vcruntime140.dll',
+    'python311.dll',
+    'qwindows.dll',
+    '_ssl.pyd',
+    '_hashlib.pyd',
+]
+
+a = Analysis(
+    ['src/main.py'],  # Entry point
+    pathex=[],
+    binaries=[],
+    datas=collect_data_files('flet'),  # Flet web client assets
+    hiddenimports=hiddenimports,
+    hookspath=[],
+    hooksconfig={},
+    runtime_hooks=[],
+    excludes=excludes,
+    noarchive=False,  # Modules go into the PYZ as bytecode only
+    optimize=2,  # Strip docstrings and asserts from bundled bytecode
+)
+
+# Drop Python sources that hooks collected as data files; their bytecode
+# is already in the PYZ
+a.datas = [entry for entry in a.datas if not entry[0].endswith('.py')]
+
+pyz = PYZ(a.pure)
+
+exe_options = dict(
+    name='PortfolioTracker',  # Executable name
+    debug=False,
+    bootloader_ignore_signals=False,
+    strip=use_strip,  # Strip debug symbols
+    upx=use_upx,
+    upx_exclude=upx_exclude,
+    console=False,  # No console window (GUI app)
+    # Icon (if available)
+    # icon='assets/icons/app.ico',
+    version='version_info.txt' if sys.platform == 'win32' else None,
+)
+
+if options.release:
+    # Single file for distribution; unpacked to a temp dir on every launch
+    exe = EXE(
+        pyz,
+        a.scripts,
+        a.binaries,
+        a.datas,
+        [],
+        runtime_tmpdir=None,
+        **exe_options,
+    )
+else:
+    # One directory for development; launches without an extraction step
+    exe = EXE(
+        pyz,
+        a.scripts,
+        [],
+        exclude_binaries=True,
+        **exe_options,
+    )
+    coll = COLLECT(
+        exe,
+        a.binaries,
+        a.datas,
+        strip=use_strip,
+        upx=use_upx,
+        upx_exclude=upx_exclude,
+        name='PortfolioTracker',
+    )
@@ -6,68 +6,154 @@ Optimized for minimal size and maximum performance.
 import os
 import sys
 import shutil
+import argparse
+import hashlib
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import PyInstaller.__main__
 
+from compile_cython import compile_extensions, clean_extensions
+
+
+# Committed PyInstaller spec holding all build options
+SPEC_FILE = 'PortfolioTracker.spec'
+
+# PyInstaller work directories are cached under build/, one per build key
+BUILD_CACHE_DIR = Path('build')
+MAX_CACHED_WORKPATHS = 5
+DELETING_PREFIX = '.deleting-'
+
+# Dev builds are one-directory bundles, kept apart from release executables
+DEV_DISTPATH = 'dist/dev'
+
 
 def clean_build_directories():
-    """Clean previous build artifacts."""
-    dirs_to_clean = ['build', 'dist', '__pycache__']
-    for dir_name in dirs_to_clean:
-        if Path(dir_name).exists():
-            shutil.rmtree(dir_name)
-            print(f"Cleaned {dir_name}/")
+    """
+    Clean previous build artifacts.
+    Removes PyInstaller's work directory, so the next build is a full one.
+    Subtrees are removed in parallel since deletion is syscall-bound.
+    """
+    dirs_to_clean = [Path('build'), Path('dist')]
+    
+    # Each top-level entry of build/ and dist/ is removed as its own task
+    targets = []
+    for directory in dirs_to_clean:
+        if directory.exists():
+            targets.extend(directory.iterdir())
+    targets.extend(Path('.').glob('__pycache__'))
+    targets.extend(Path('src').rglob('__pycache__'))
+    
+    max_workers = min(32, (os.cpu_count() or 1) * 4)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        list(executor.map(remove_path, targets))
+    
+    for directory in dirs_to_clean:
+        if directory.exists():
+            shutil.rmtree(directory)
+            print(f"Cleaned {directory}/")
+    print(f"Removed {len(targets)} build entries")
+
+
+def remove_path(path):
+    """Remove a file or directory tree."""
+    if path.is_dir() and not path.is_symlink():
+        shutil.rmtree(path, ignore_errors=True)
+    else:
+        path.unlink(missing_ok=True)
+
+
+def get_workpath():
+    """
+    Get the cached PyInstaller work directory for the current build inputs.
+    Keyed on the interpreter, requirements and spec, which decide the
+    dependency graph; source edits reuse the same work directory and are
+    picked up by PyInstaller's own per-module checks.
+    """
+    digest = hashlib.sha256(sys.version.encode())
+    for file_name in ('requirements.txt', SPEC_FILE):
+        digest.update(Path(file_name).read_bytes())
+    return BUILD_CACHE_DIR / digest.hexdigest()[:12]
+
+
+def remove_in_background(path):
+    """
+    Remove a directory tree without waiting for it.
+    The tree is renamed out of the way (O(1)) and deleted by a detached
+    process, so the build does not pay for per-file deletes.
+    """
+    doomed = path.with_name(f"{DELETING_PREFIX}{path.name}.{os.getpid()}")
+    path.rename(doomed)
     
-    # Clean .spec files
-    for spec_file in Path('.').glob('*.spec'):
-        spec_file.unlink()
-        print(f"Removed {spec_file}")
+    if sys.platform == 'win32':
+        detach = {'creationflags': subprocess.DETACHED_PROCESS}
+    else:
+        detach = {'start_new_session': True}
+    subprocess.Popen(
+        [sys.executable, '-c', 'import shutil, sys; shutil.rmtree(sys.argv[1], ignore_errors=True)', str(doomed)],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        **detach
+    )
+
+
+def prune_build_cache(keep):
+    """Remove the least recently used work directories beyond the cache limit."""
+    workpaths = sorted(
+        (
+            path for path in BUILD_CACHE_DIR.iterdir()
+            if path.is_dir() and path != keep and not path.name.startswith(DELETING_PREFIX)
+        ),
+        key=lambda path: path.stat().st_mtime,
+        reverse=True
+    )
+    for stale in workpaths[MAX_CACHED_WORKPATHS - 1:]:
+        remove_in_background(stale)
+        print(f"Evicted cached build {stale}/")
+
+
+def get_exe_path(release):
+    """Get the path of the built executable."""
+    exe_name = 'PortfolioTracker.exe' if sys.platform == 'win32' else 'PortfolioTracker'
+    if release:
+        return Path('dist') / exe_name
+    return Path(DEV_DISTPATH) / 'PortfolioTracker' / exe_name
 
 
-def build_executable():
-    """Build the executable using PyInstaller."""
+def build_executable(release=False):
+    """
+    Build the executable from the committed PyInstaller spec.
+    Release builds produce a single file; dev builds a one-directory bundle.
+    """
+    workpath = get_workpath()
+    workpath.mkdir(parents=True, exist_ok=True)
+    os.utime(workpath)  # Mark as most recently used
+    prune_build_cache(keep=workpath)
     
-    # Base PyInstaller arguments
+    # Build options live in the spec; only paths are passed here
     args = [
-        'src/main.py',  # Entry point
-        '--name=PortfolioTracker',  # Executable name
-        '--onefile',  # Single file executable
-        '--windowed',  # No console window (GUI app)
-        '--clean',  # Clean PyInstaller cache
-        
-        # Icon (if available)
-        # '--icon=assets/icons/app.ico',
-        
-        # Optimize for size
-        '--strip',  # Strip debug symbols
-        '--noupx',  # Don't use UPX (can cause false antivirus positives)
-        
-        # Hidden imports for Flet and dependencies
-        '--hidden-import=flet',
-        '--hidden-import=flet.page',
-        '--hidden-import=flet.app',
-        '--hidden-import=sqlalchemy.sql.default_comparator',
-        '--hidden-import=cryptography',
-        '--hidden-import=bcrypt',
-        '--hidden-import=argon2',
-        
-        # Add data files
-        # '--add-data=assets;assets',
-        
-        # Paths
-        '--distpath=dist',
-        '--workpath=build',
-        '--specpath=.',
-        
-        # Additional optimizations
+        SPEC_FILE,
+        f"--distpath={'dist' if release else DEV_DISTPATH}",
+        f'--workpath={workpath}',
+        '--noconfirm',  # Overwrite dist/ without prompting
         '--log-level=INFO',
     ]
     
-    # Add Windows-specific options
-    if sys.platform == 'win32':
-        args.extend([
-            '--version-file=version_info.txt',  # If version info exists
-        ])
+    # Symbols are only stripped when binutils' strip is available
+    if shutil.which('strip') is None:
+        print("⚠️  Warning: 'strip' not found on PATH, debug symbols will not be stripped")
+        if sys.platform == 'win32':
+            print("   Install MSYS2 binutils and add its bin/ directory to PATH")
+    
+    # UPX is looked up on PATH unless UPX_DIR points to it
+    upx_dir = os.environ.get('UPX_DIR')
+    if sys.platform == 'win32' and upx_dir:
+        args.append(f'--upx-dir={upx_dir}')
+    
+    # Options for the spec itself follow '--'
+    if release:
+        args.extend(['--', '--release'])
     
     print("Building executable with PyInstaller...")
     print(f"Arguments: {' '.join(args)}")
@@ -76,7 +162,7 @@ def build_executable():
     PyInstaller.__main__.run(args)
     
     print("\nBuild complete!")
-    print(f"Executable location: dist/PortfolioTracker{'.exe' if sys.platform == 'win32' else ''}")
+    print(f"Executable location: {get_exe_path(release).as_posix()}")
 
 
 def create_version_info():
@@ -127,23 +213,16 @@ VSVersionInfo(
         print("Created version_info.txt for Windows build")
 
 
-def post_build_cleanup():
-    """Perform post-build cleanup and optimization."""
-    # Remove build directory
-    if Path('build').exists():
-        shutil.rmtree('build')
-        print("Cleaned build directory")
-    
-    # Remove spec file
-    for spec_file in Path('.').glob('*.spec'):
-        spec_file.unlink()
-        print(f"Removed {spec_file}")
-    
-    # Check executable size
-    exe_name = 'PortfolioTracker.exe' if sys.platform == 'win32' else 'PortfolioTracker'
-    exe_path = Path('dist') / exe_name
+def post_build_cleanup(release=False):
+    """
+    Perform post-build checks.
+    The cached build/ work directories are kept so the next build can
+    reuse PyInstaller's analysis.
+    """
+    # Check executable size (the target applies to the single-file release)
+    exe_path = get_exe_path(release=True)
     
-    if exe_path.exists():
+    if release and exe_path.exists():
         size_mb = exe_path.stat().st_size / (1024 * 1024)
         print(f"\nExecutable size: {size_mb:.2f} MB")
         
@@ -153,15 +232,54 @@ def post_build_cleanup():
             print("✅ Executable size is within target range")
 
 
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Build the Portfolio Tracker executable.")
+    parser.add_argument(
+        'command',
+        nargs='?',
+        choices=['build', 'clean'],
+        default='build',
+        help="'build' (default) builds the executable, 'clean' only removes build artifacts"
+    )
+    parser.add_argument(
+        '--full',
+        action='store_true',
+        help="Clean previous build artifacts before building (disables incremental rebuild)"
+    )
+    parser.add_argument(
+        '--release',
+        action='store_true',
+        help="Build the single-file release executable (default: one-directory dev build)"
+    )
+    parser.add_argument(
+        '--cython',
+        action='store_true',
+        help="Compile core modules with Cython before bundling"
+    )
+    return parser.parse_args()
+
+
 def main():
     """Main build process."""
+    args = parse_args()
+    
+    if args.command == 'clean':
+        print("Cleaning build artifacts...")
+        clean_build_directories()
+        clean_extensions()
+        return
+    
     print("=" * 50)
     print("Portfolio Tracker - Build Process")
     print("=" * 50)
     
-    # Clean previous builds
-    print("\n1. Cleaning previous builds...")
-    clean_build_directories()
+    # Clean previous builds (full rebuild only)
+    if args.full:
+        print("\n1. Cleaning previous builds...")
+        clean_build_directories()
+    else:
+        print("\n1. Reusing previous build cache (pass --full for a clean build)")
     
     # Create version info for Windows
     if sys.platform == 'win32':
@@ -170,11 +288,17 @@ def main():
     
     # Build executable
     print("\n3. Building executable...")
-    build_executable()
+    if args.cython:
+        compile_extensions()
+    try:
+        build_executable(release=args.release)
+    finally:
+        if args.cython:
+            clean_extensions()
     
     # Post-build cleanup
     print("\n4. Post-build cleanup...")
-    post_build_cleanup()
+    post_build_cleanup(release=args.release)
     
     print("\n" + "=" * 50)
     print("Build process complete!")
@@ -0,0 +1,53 @@
+"""
+Cython compilation step for the PyInstaller build.
+Compiles the startup-critical modules to native extensions in place so
+the bundled executable imports them without running Python bytecode.
+"""
+
+import sys
+import subprocess
+from pathlib import Path
+
+
+# Modules compiled to extensions; the .py files stay as the source of truth
+CYTHON_MODULES = [
+    'src/utils/config.py',
+    'src/utils/crypto.py',
+    'src/core/database.py',
+]
+
+
+def compile_extensions():
+    """Compile CYTHON_MODULES to extension modules next to their sources."""
+    print(f"Compiling {len(CYTHON_MODULES)} modules with Cython...")
+    subprocess.check_call([
+        sys.executable, '-m', 'Cython.Build.Cythonize',
+        '-i',  # Build extensions in place
+        '-3',  # Python 3 language level
+        *CYTHON_MODULES,
+    ])
+    print("Cython compilation complete")
+
+
+def clean_extensions():
+    """
+    Remove compiled extensions and generated C files.
+    Extensions take import precedence over .py files, so stale ones would
+    shadow source edits when running from the tree.
+    """
+    for module in CYTHON_MODULES:
+        source = Path(module)
+        generated = [source.with_suffix('.c')]
+        generated += source.parent.glob(f'{source.stem}.*.so')
+        generated += source.parent.glob(f'{source.stem}.*.pyd')
+        for path in generated:
+            if path.exists():
+                path.unlink()
+                print(f"Removed {path}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == 'clean':
+        clean_extensions()
+    else:
+        compile_extensions()
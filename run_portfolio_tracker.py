@@ -5,10 +5,14 @@ Run this script from the project root directory.
 """
 
 import sys
-import os
+import argparse
+import importlib.util
 import traceback
+from importlib.metadata import distribution, PackageNotFoundError
 from pathlib import Path
 
+from src.utils.paths import find_missing_files
+
 def print_diagnostic_info():
     """Print diagnostic information"""
     print("🔍 Diagnostic Information:")
@@ -30,11 +34,7 @@ def check_python_version():
 def check_project_structure():
     """Check if we're in the right directory"""
     required_files = ['src/main.py', 'src/utils/config.py', 'requirements.txt']
-    missing_files = []
-    
-    for file_path in required_files:
-        if not Path(file_path).exists():
-            missing_files.append(file_path)
+    missing_files = find_missing_files(required_files)
     
     if missing_files:
         print("❌ Missing project files:")
@@ -46,8 +46,44 @@ def check_project_structure():
     print("✅ Project structure verified")
     return True
 
+def check_application_modules():
+    """Check that our modules can be found, without importing them"""
+    print("\n🔧 Locating application modules...")
+    modules = [
+        'src.utils.config',
+        'src.utils.crypto',
+        'src.core.database',
+        'src.gui.dashboard',
+        'src.main',
+    ]
+    
+    missing_modules = []
+    for module in modules:
+        try:
+            found = importlib.util.find_spec(module) is not None
+        except ImportError:
+            found = False
+        if found:
+            print(f"   ✅ {module}")
+        else:
+            print(f"   ❌ {module}")
+            missing_modules.append(module)
+    
+    if missing_modules:
+        print(f"\n❌ Missing modules: {', '.join(missing_modules)}")
+        return False
+    return True
+
 def main():
     """Main launcher function with detailed diagnostics"""
+    parser = argparse.ArgumentParser(description="Launch Portfolio Tracker Pro.")
+    parser.add_argument(
+        '--diagnose',
+        action='store_true',
+        help="Verify that all application modules can be located before starting"
+    )
+    diagnose = parser.parse_args().diagnose
+    
     print("🚀 Portfolio Tracker Pro - Launcher")
     print("=" * 50)
     
@@ -77,13 +113,14 @@ def main():
         'cryptography', 'bcrypt', 'pandas', 'numpy', 'aiohttp'
     ]
     
+    # Look up installed distributions without importing their modules
     missing_packages = []
     for package in required_packages:
         try:
-            __import__(package)
+            distribution(package)
             print(f"   ✅ {package}")
-        except ImportError as e:
-            print(f"   ❌ {package} - {e}")
+        except PackageNotFoundError:
+            print(f"   ❌ {package} - not installed")
             missing_packages.append(package)
     
     if missing_packages:
@@ -93,30 +130,17 @@ def main():
         input("Press Enter to exit...")
         sys.exit(1)
     
-    # Try importing our modules
-    print("\n🔧 Testing application imports...")
+    # Locate our modules without executing them
+    if diagnose:
+        if not check_application_modules():
+            input("Press Enter to exit...")
+            sys.exit(1)
+    
+    # Import the application only once, right before starting it
     try:
-        print("   Testing src.utils.config...")
-        from src.utils.config import get_config
-        print("   ✅ Config module loaded")
-        
-        print("   Testing src.utils.crypto...")
-        from src.utils.crypto import get_security_manager
-        print("   ✅ Crypto module loaded")
-        
-        print("   Testing src.core.database...")
-        from src.core.database import get_db_manager
-        print("   ✅ Database module loaded")
-        
-        print("   Testing src.gui.dashboard...")
-        from src.gui.dashboard import DashboardView
-        print("   ✅ GUI module loaded")
-        
-        print("   Testing src.main...")
+        import flet as ft
         from src.main import main as app_main
-        print("   ✅ Main module loaded")
-        
-    except Exception as e:
+    except ImportError as e:
         print(f"❌ Import error: {e}")
         print(f"❌ Full traceback:")
         traceback.print_exc()
@@ -126,7 +150,6 @@ def main():
     # Start the application
     print("\n🚀 Starting Portfolio Tracker Pro...")
     try:
-        import flet as ft
         ft.app(target=app_main)
         
     except KeyboardInterrupt:
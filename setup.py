@@ -6,9 +6,13 @@ Automated setup for the Portfolio Tracker project.
 
 import sys
 import os
+import compileall
 import subprocess
+from importlib.metadata import distribution, PackageNotFoundError
 from pathlib import Path
 
+from src.utils.paths import find_missing_files
+
 def check_python_version():
     """Check if Python version is 3.11+"""
     version = sys.version_info
@@ -19,11 +23,67 @@ def check_python_version():
     print(f"✅ Python version: {version.major}.{version.minor}.{version.micro}")
     return True
 
+PIP_CACHE_DIR = Path.home() / ".cache" / "portfolio-tracker-pip"
+
+def requirements_satisfied(requirements_file="requirements.txt"):
+    """Check if every requirement is already installed in a matching version"""
+    try:
+        from importlib.metadata import version, PackageNotFoundError
+        from packaging.requirements import Requirement
+    except ImportError:
+        return False
+    
+    for line in Path(requirements_file).read_text().splitlines():
+        line = line.split("#", 1)[0].strip()
+        if not line:
+            continue
+        req = Requirement(line)
+        if req.marker and not req.marker.evaluate():
+            continue
+        try:
+            installed = version(req.name)
+        except PackageNotFoundError:
+            return False
+        if not req.specifier.contains(installed, prereleases=True):
+            return False
+    return True
+
+def run_pip(args):
+    """
+    Run pip in-process, avoiding a second interpreter startup.
+    Falls back to a pip subprocess if pip's internal API is unavailable.
+    """
+    try:
+        from pip._internal.cli.main import main as pip_main
+    except ImportError:
+        pip_main = None
+    
+    if pip_main is not None:
+        try:
+            return_code = pip_main(args)
+        except Exception as e:
+            print(f"   In-process pip failed ({e}), retrying in a subprocess")
+        else:
+            if return_code != 0:
+                raise subprocess.CalledProcessError(return_code, ["pip", *args])
+            return
+    
+    subprocess.check_call([sys.executable, "-m", "pip", *args])
+
 def install_dependencies():
     """Install required dependencies"""
     print("\n📦 Installing dependencies...")
+    if requirements_satisfied():
+        print("✅ Dependencies already installed")
+        return True
     try:
-        subprocess.check_call([sys.executable, "-m", "pip", "install", "-r", "requirements.txt"])
+        run_pip([
+            "install",
+            "--prefer-binary",
+            "--only-binary=:all:",
+            "--cache-dir", str(PIP_CACHE_DIR),
+            "-r", "requirements.txt"
+        ])
         print("✅ Dependencies installed successfully")
         return True
     except subprocess.CalledProcessError as e:
@@ -45,12 +105,17 @@ def setup_project_structure():
         "src/api/__init__.py"
     ]
     
-    for init_file in init_files:
-        init_path = Path(init_file)
-        if not init_path.exists():
-            init_path.parent.mkdir(parents=True, exist_ok=True)
-            init_path.write_text("# Auto-generated __init__.py\n")
-            print(f"   Created: {init_file}")
+    missing_files = find_missing_files(init_files)
+    if not missing_files:
+        print("✅ Project structure already initialized")
+        return
+    
+    for directory in {Path(init_file).parent for init_file in missing_files}:
+        directory.mkdir(parents=True, exist_ok=True)
+    
+    for init_file in missing_files:
+        Path(init_file).write_text("# Auto-generated __init__.py\n")
+        print(f"   Created: {init_file}")
     
     print("✅ Project structure verified")
 
@@ -71,11 +136,12 @@ def test_imports():
     
     failed_imports = []
     
+    # Look up installed distributions without importing their modules
     for module, description in test_imports:
         try:
-            __import__(module)
+            distribution(module)
             print(f"   ✅ {description}")
-        except ImportError:
+        except PackageNotFoundError:
             print(f"   ❌ {description}")
             failed_imports.append(module)
     
@@ -87,6 +153,15 @@ def test_imports():
     print("✅ All imports successful")
     return True
 
+def precompile_sources():
+    """Precompile application bytecode so the first launch skips compilation"""
+    print("\n⚙️  Precompiling application modules...")
+    # workers=0 compiles on all CPU cores
+    if compileall.compile_dir("src", quiet=1, workers=0):
+        print("✅ Application modules precompiled")
+    else:
+        print("⚠️  Some modules failed to compile")
+
 def create_launcher_scripts():
     """Create platform-specific launcher scripts"""
     print("\n🚀 Creating launcher scripts...")
@@ -139,6 +214,9 @@ def main():
     if not test_imports():
         return False
     
+    # Precompile bytecode
+    precompile_sources()
+    
     # Create launcher scripts
     create_launcher_scripts()
     
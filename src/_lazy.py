@@ -0,0 +1,25 @@
+"""
+Lazy package exports (PEP 562).
+Lets a package list its public names without importing their submodules
+until first use.
+"""
+
+import sys
+from importlib import import_module
+from typing import Callable, Dict, List, Tuple
+
+
+def lazy_exports(package: str, exports: Dict[str, str]) -> Tuple[Callable, List[str]]:
+    """
+    Build a package's module __getattr__ and __all__.
+    exports maps each public name to the relative submodule providing it.
+    """
+    def __getattr__(name: str):
+        if name in exports:
+            value = getattr(import_module(exports[name], package), name)
+            # Cache on the package so later lookups skip __getattr__
+            setattr(sys.modules[package], name, value)
+            return value
+        raise AttributeError(f"module {package!r} has no attribute {name!r}")
+    
+    return __getattr__, list(exports)
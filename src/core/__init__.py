@@ -1 +1,8 @@
-# Auto-generated __init__.py
+"""Core services: database access."""
+
+from src._lazy import lazy_exports
+
+__getattr__, __all__ = lazy_exports(__name__, {
+    'DatabaseManager': '.database',
+    'get_db_manager': '.database',
+})
@@ -3,24 +3,46 @@ Database management module with encryption support.
 Handles SQLite database operations with ACID compliance.
 """
 
-import json
+import io
+import os
 import sqlite3
-from datetime import datetime
+import threading
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Optional, Any, Dict, List
+from typing import Optional, Any, Dict, List, Union
 from contextlib import contextmanager
 
-from sqlalchemy import create_engine, text, event, Column, String, Integer, Float, DateTime, Boolean, Text
+from sqlalchemy import (
+    bindparam, create_engine, func, insert, select, text, update, event,
+    Column, ForeignKey, Index, String, Integer, Float, DateTime, Boolean, Text, LargeBinary
+)
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, Session
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.orm import relationship, selectinload, sessionmaker, Session
+from sqlalchemy.pool import QueuePool
+from cryptography.fernet import InvalidToken
 
 from src.utils.config import get_config
 from src.utils.crypto import get_security_manager, SecurityError
+from src.utils.serialization import JSONDecodeError, json_dumps, json_loads
 
 
 Base = declarative_base()
 
+# Schema/data format version, stored in the "db_version" setting
+DB_VERSION = "1.1"
+
+# Fernet tokens are base64 text that always starts with this prefix
+FERNET_TOKEN_PREFIX = b"gAAAAA"
+FERNET_TOKEN_TEXT_PREFIX = FERNET_TOKEN_PREFIX.decode()
+
+# Pages copied per step of the SQLite online backup
+BACKUP_PAGES_PER_STEP = 1024
+
+# Memory-mapped I/O window: twice the database size, within these bounds
+MMAP_SIZE_DEFAULT = 256 * 1024 * 1024
+MMAP_SIZE_MAX = 2 * 1024 ** 3
+
 
 class Account(Base):
     """Account/Depot model for storing trading accounts."""
@@ -32,10 +54,20 @@ class Account(Base):
     broker = Column(String(100))  # Broker/Exchange name
     currency = Column(String(3), default='EUR')
     initial_balance = Column(Float, default=0.0)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # SQL-side CURRENT_TIMESTAMP (UTC), filled by SQLite within the INSERT/UPDATE
+    created_at = Column(DateTime, default=func.now())
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
     is_active = Column(Boolean, default=True)
-    metadata_encrypted = Column(Text)  # Encrypted JSON for sensitive data
+    metadata_encrypted = Column(LargeBinary)  # Encrypted JSON for sensitive data
+    
+    # Loaded explicitly with selectinload() where needed
+    transactions = relationship(
+        'Transaction', back_populates='account', order_by='Transaction.transaction_date'
+    )
+    
+    __table_args__ = (
+        Index('ix_account_active', 'is_active'),
+    )
 
 
 class Asset(Base):
@@ -50,7 +82,11 @@ class Asset(Base):
     currency = Column(String(3))
     last_price = Column(Float)
     last_updated = Column(DateTime)
-    metadata_encrypted = Column(Text)
+    metadata_encrypted = Column(LargeBinary)
+    
+    __table_args__ = (
+        Index('ix_asset_symbol', 'symbol'),
+    )
 
 
 class Transaction(Base):
@@ -58,8 +94,8 @@ class Transaction(Base):
     __tablename__ = 'transactions'
     
     id = Column(Integer, primary_key=True)
-    account_id = Column(Integer, nullable=False)
-    asset_id = Column(Integer)
+    account_id = Column(Integer, ForeignKey('accounts.id'), nullable=False)
+    asset_id = Column(Integer, ForeignKey('assets.id'))
     transaction_type = Column(String(20), nullable=False)  # 'buy', 'sell', 'dividend', 'fee'
     quantity = Column(Float)
     price = Column(Float)
@@ -67,9 +103,18 @@ class Transaction(Base):
     currency = Column(String(3), default='EUR')
     fee = Column(Float, default=0.0)
     transaction_date = Column(DateTime, nullable=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=func.now())
     notes = Column(Text)
-    metadata_encrypted = Column(Text)
+    metadata_encrypted = Column(LargeBinary)
+    
+    # One batched SELECT ... IN per relationship instead of a query per row
+    account = relationship('Account', back_populates='transactions', lazy='selectin')
+    asset = relationship('Asset', lazy='selectin')
+    
+    __table_args__ = (
+        Index('ix_tx_account_date', 'account_id', 'transaction_date'),  # Also serves account_id
+        Index('ix_tx_asset', 'asset_id'),
+    )
 
 
 class PortfolioSnapshot(Base):
@@ -82,7 +127,11 @@ class PortfolioSnapshot(Base):
     total_value_usd = Column(Float)
     cash_eur = Column(Float, default=0.0)
     cash_usd = Column(Float, default=0.0)
-    metadata_encrypted = Column(Text)
+    metadata_encrypted = Column(LargeBinary)
+    
+    __table_args__ = (
+        Index('ix_snap_date', 'snapshot_date'),
+    )
 
 
 class Settings(Base):
@@ -92,7 +141,46 @@ class Settings(Base):
     key = Column(String(100), primary_key=True)
     value = Column(Text)
     encrypted = Column(Boolean, default=False)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+
+
+# Statements built once at import; each call reuses SQLAlchemy's cached compilation
+_SETTING_BY_KEY = select(Settings.value, Settings.encrypted).where(
+    Settings.key == bindparam('key')
+)
+_ANY_SETTING = text("SELECT 1 FROM settings LIMIT 1")
+# Plain rows of the columns get_accounts needs; no ORM objects are built
+_ALL_ACCOUNTS = select(
+    Account.id,
+    Account.name,
+    Account.account_type,
+    Account.broker,
+    Account.currency,
+    Account.initial_balance,
+    Account.created_at,
+    Account.is_active,
+    Account.metadata_encrypted,
+)
+_ACTIVE_ACCOUNTS = _ALL_ACCOUNTS.where(Account.is_active == True)
+_UPSERT_SETTING = sqlite_insert(Settings).values(
+    key=bindparam('key'),
+    value=bindparam('value'),
+    encrypted=bindparam('encrypted'),
+    updated_at=func.now()
+)
+_UPSERT_SETTING = _UPSERT_SETTING.on_conflict_do_update(
+    index_elements=[Settings.key],
+    set_={
+        "value": _UPSERT_SETTING.excluded.value,
+        "encrypted": _UPSERT_SETTING.excluded.encrypted,
+        "updated_at": _UPSERT_SETTING.excluded.updated_at,
+    }
+)
+_INTEGRITY_CHECK = text("PRAGMA integrity_check")
+_OPTIMIZE = text("PRAGMA optimize")
+_EXISTING_TABLES = text(
+    "SELECT name FROM sqlite_master WHERE type='table' AND name IN :names"
+).bindparams(bindparam('names', expanding=True))
 
 
 class DatabaseManager:
@@ -102,20 +190,38 @@ class DatabaseManager:
         self.config = get_config()
         self.security = get_security_manager()
         self.engine = None
+        self.read_engine = None
         self.Session = None
+        self.ReadSession = None
+        self._make_session = None  # Set once initialized
         self._initialized = False
+        self._init_lock = threading.Lock()  # Serializes initialize() calls
+        
+        # Stored (value, encrypted) pairs by key. Values are parsed and
+        # decrypted on every read, so logout still hides encrypted settings.
+        self._setting_cache: Dict[str, tuple] = {}
+        self._setting_cache_lock = threading.Lock()
+        self._setting_generation = 0  # Bumped on every write
     
     def initialize(self, check_auth: bool = True) -> bool:
         """
         Initialize the database connection.
         Creates tables if they don't exist.
         """
+        # Only check auth if explicitly requested and not during first setup
+        if check_auth and not self.security.is_first_run() and not self.security.is_authenticated():
+            print("Database initialization failed: Not authenticated")
+            return False
+        
+        with self._init_lock:
+            # Engines stay valid across logout and login
+            if self._initialized:
+                return True
+            return self._open_database()
+    
+    def _open_database(self) -> bool:
+        """Create the engines and schema; called by initialize() under its lock."""
         try:
-            # Only check auth if explicitly requested and not during first setup
-            if check_auth and not self.security.is_first_run() and not self.security.is_authenticated():
-                print("Database initialization failed: Not authenticated")
-                return False
-            
             # Create database directory
             db_dir = self.config.DB_PATH.parent
             try:
@@ -125,17 +231,31 @@ class DatabaseManager:
                 print(f"Failed to create database directory: {e}")
                 return False
             
+            # Persistent file settings, applied once rather than per connection
+            try:
+                self._bootstrap_database_file()
+            except Exception as e:
+                print(f"Warning: Could not set persistent SQLite pragmas: {e}")
+            
             # Create engine with proper SQLite configuration
-            db_url = f"sqlite:///{self.config.DB_PATH}"
+            db_url = self.config.get_db_url()
             print(f"Database URL: {db_url}")
             
             self.engine = create_engine(
                 db_url,
                 connect_args={
                     "check_same_thread": False,
-                    "timeout": 30
+                    "timeout": self.config.DB_BUSY_TIMEOUT_SECONDS
                 },
-                poolclass=StaticPool,
+                # SQLite allows one writer at a time; writers queue for this
+                # connection instead of spinning on the busy timeout
+                poolclass=QueuePool,
+                pool_size=1,
+                max_overflow=0,
+                pool_timeout=self.config.DB_BUSY_TIMEOUT_SECONDS,
+                pool_pre_ping=True,
+                pool_recycle=3600,
+                query_cache_size=1200,  # Compiled statement cache entries
                 echo=False  # Set to True for SQL debugging
             )
             
@@ -144,18 +264,36 @@ class DatabaseManager:
             def set_sqlite_pragma(dbapi_conn, connection_record):
                 cursor = dbapi_conn.cursor()
                 try:
+                    # Connection-scoped settings only; see _bootstrap_database_file
                     if self.config.DB_WAL_MODE:
-                        cursor.execute("PRAGMA journal_mode=WAL")
+                        cursor.execute(
+                            f"PRAGMA wal_autocheckpoint={self.config.DB_WAL_AUTOCHECKPOINT_PAGES}"
+                        )
+                    # Truncate the WAL/journal back to this size after checkpoints
+                    cursor.execute(f"PRAGMA journal_size_limit={self.config.DB_JOURNAL_SIZE_LIMIT}")
+                    # Busy timeout is set by the driver's "timeout" connect arg
                     cursor.execute("PRAGMA foreign_keys=ON")
                     cursor.execute("PRAGMA synchronous=NORMAL")
+                    # Negative cache_size is in KiB rather than pages
+                    cursor.execute(f"PRAGMA cache_size=-{self.config.DB_CACHE_SIZE_KB}")
                     cursor.execute("PRAGMA temp_store=MEMORY")
-                    cursor.execute("PRAGMA mmap_size=268435456")  # 256MB
+                    cursor.execute(f"PRAGMA mmap_size={self._mmap_size()}")
+                    # Keep the ANALYZE run by PRAGMA optimize cheap on large tables
+                    cursor.execute("PRAGMA analysis_limit=1000")
                     print("SQLite pragmas set successfully")
                 except Exception as e:
                     print(f"Warning: Could not set SQLite pragmas: {e}")
                 finally:
                     cursor.close()
             
+            # Refresh planner statistics when a pooled connection is closed
+            @event.listens_for(self.engine, "close")
+            def optimize_on_close(dbapi_conn, connection_record):
+                try:
+                    dbapi_conn.execute("PRAGMA optimize")
+                except Exception as e:
+                    print(f"Warning: Could not optimize database: {e}")
+            
             # Test database connection
             try:
                 with self.engine.connect() as conn:
@@ -169,24 +307,67 @@ class DatabaseManager:
             # Create all tables
             try:
                 Base.metadata.create_all(self.engine)
+                # create_all skips indexes of tables that already exist
+                for table in Base.metadata.sorted_tables:
+                    for index in table.indexes:
+                        index.create(self.engine, checkfirst=True)
                 print("Database tables created/verified")
+                # Let the query planner pick up the indexes
+                with self.engine.begin() as conn:
+                    conn.execute(_OPTIMIZE)
             except Exception as e:
                 print(f"Failed to create database tables: {e}")
                 return False
             
-            # Create session factory
+            # Read-only engine: one connection per concurrent reader so WAL
+            # readers proceed while the writer is busy
+            db_uri = f"{self.config.DB_PATH.resolve().as_uri()}?mode=ro"
+            self.read_engine = create_engine(
+                "sqlite://",
+                creator=lambda: sqlite3.connect(
+                    db_uri,
+                    uri=True,
+                    check_same_thread=False,
+                    timeout=self.config.DB_BUSY_TIMEOUT_SECONDS
+                ),
+                poolclass=QueuePool,
+                pool_size=self.config.DB_POOL_SIZE,
+                max_overflow=self.config.DB_MAX_OVERFLOW,
+                pool_pre_ping=True,
+                pool_recycle=3600,
+                query_cache_size=1200,
+                echo=False
+            )
+            
+            @event.listens_for(self.read_engine, "connect")
+            def set_read_pragma(dbapi_conn, connection_record):
+                cursor = dbapi_conn.cursor()
+                try:
+                    cursor.execute(f"PRAGMA cache_size=-{self.config.DB_CACHE_SIZE_KB}")
+                    cursor.execute("PRAGMA temp_store=MEMORY")
+                    cursor.execute(f"PRAGMA mmap_size={self._mmap_size()}")
+                except Exception as e:
+                    print(f"Warning: Could not set SQLite pragmas: {e}")
+                finally:
+                    cursor.close()
+            
+            # Create session factories
             self.Session = sessionmaker(bind=self.engine)
+            self.ReadSession = sessionmaker(bind=self.read_engine)
+            self._make_session = self.Session
+            self._initialized = True
             
             # Initialize default settings if first run
             try:
                 if self._is_first_db_run():
                     self._initialize_defaults()
                     print("Default settings initialized")
+                else:
+                    self._migrate()
             except Exception as e:
                 print(f"Warning: Could not initialize default settings: {e}")
                 # Don't fail entirely if this fails
             
-            self._initialized = True
             print("Database initialization completed successfully")
             return True
             
@@ -196,13 +377,41 @@ class DatabaseManager:
             traceback.print_exc()
             return False
     
+    def _bootstrap_database_file(self):
+        """
+        Apply the PRAGMAs that are stored in the database file itself.
+        Page size only takes effect before the file is populated; existing
+        databases keep their page size until a VACUUM. WAL mode persists
+        once set, so pooled connections don't need to repeat either.
+        """
+        conn = sqlite3.connect(str(self.config.DB_PATH))
+        try:
+            if conn.execute("PRAGMA page_count").fetchone()[0] == 0:
+                conn.execute(f"PRAGMA page_size={self.config.DB_PAGE_SIZE}")
+            if self.config.DB_WAL_MODE:
+                conn.execute("PRAGMA journal_mode=WAL")
+        finally:
+            conn.close()
+    
+    def _mmap_size(self) -> int:
+        """Size the memory map to cover the database file with room to grow."""
+        try:
+            db_size = os.path.getsize(self.config.DB_PATH)
+        except OSError:
+            db_size = 0
+        if not db_size:
+            return MMAP_SIZE_DEFAULT
+        return min(MMAP_SIZE_MAX, max(MMAP_SIZE_DEFAULT, db_size * 2))
+    
     @contextmanager
     def get_session(self) -> Session:
         """Context manager for database sessions with automatic rollback on error."""
-        if not self._initialized:
+        # The factory is only set once initialized, so one lookup does both
+        make_session = self._make_session
+        if make_session is None:
             raise RuntimeError("Database not initialized")
         
-        session = self.Session()
+        session = make_session()
         try:
             yield session
             session.commit()
@@ -213,48 +422,110 @@ class DatabaseManager:
         finally:
             session.close()
     
-    def encrypt_field(self, data: Any) -> str:
-        """Encrypt data for storage in database."""
+    @contextmanager
+    def get_readonly_session(self) -> Session:
+        """
+        Context manager for read-only sessions on the reader pool.
+        Nothing is committed; writes fail with a read-only database error.
+        """
+        if self.ReadSession is None:
+            raise RuntimeError("Database not initialized")
+        
+        session = self.ReadSession()
+        try:
+            yield session
+        finally:
+            session.close()
+    
+    def encrypt_field(self, data: Any) -> Optional[bytes]:
+        """
+        Encrypt data for storage in database.
+        Bytes are taken as already-serialized JSON.
+        Returns the raw Fernet token, or the JSON bytes when not authenticated.
+        """
         if data is None:
             return None
         
+        # Serialized once; JSON goes straight to bytes, no separate encode step
+        if isinstance(data, bytes):
+            payload = data
+        elif isinstance(data, str):
+            payload = data.encode()
+        else:
+            payload = json_dumps(data)
+        
         # Only encrypt if authenticated (for sensitive data)
-        if not self.security.is_authenticated():
-            # For non-sensitive data, return as JSON string
-            return json.dumps(data) if not isinstance(data, str) else data
+        cipher = self.security.get_cipher()
+        if cipher is None:
+            # For non-sensitive data, return as JSON
+            return payload
             
         try:
-            json_str = json.dumps(data) if not isinstance(data, str) else data
-            encrypted = self.security.encrypt_data(json_str)
-            return encrypted.hex()
+            return cipher.encrypt(payload)
         except Exception as e:
             print(f"Encryption failed: {e}")
             # Fallback to unencrypted storage
-            return json.dumps(data) if not isinstance(data, str) else data
+            return payload
     
-    def decrypt_field(self, encrypted_hex: str) -> Any:
-        """Decrypt data from database."""
-        if not encrypted_hex:
+    def decrypt_field(self, stored: Union[bytes, str]) -> Any:
+        """Decrypt data from database (BLOB column or text setting value)."""
+        if not stored:
             return None
         
-        # Try to decrypt first
-        if self.security.is_authenticated():
+        # Only Fernet tokens are decrypted; JSON never starts with the token prefix
+        decrypted = None
+        cipher = self.security.get_cipher()
+        if cipher is not None and self._is_token(stored):
             try:
-                encrypted_bytes = bytes.fromhex(encrypted_hex)
-                decrypted = self.security.decrypt_data(encrypted_bytes)
-                try:
-                    return json.loads(decrypted)
-                except json.JSONDecodeError:
-                    return decrypted.decode()
-            except Exception:
+                decrypted = cipher.decrypt(stored)
+            except InvalidToken:
                 # If decryption fails, try as regular JSON
                 pass
         
-        # Fallback: try to parse as regular JSON
+        return self._load_field(stored, decrypted)
+    
+    def decrypt_fields(self, values: List[Union[bytes, str]]) -> List[Any]:
+        """
+        Decrypt many stored values, e.g. a column of query results.
+        Same rules as decrypt_field, but all tokens go through one
+        SecurityManager.decrypt_batch call.
+        """
+        positions = [i for i, value in enumerate(values) if value and self._is_token(value)]
+        
+        decrypted = {}
+        if positions and self.security.is_authenticated():
+            results = self.security.decrypt_batch([values[i] for i in positions])
+            decrypted = dict(zip(positions, results))
+        
+        return [
+            self._load_field(value, decrypted.get(i)) if value else None
+            for i, value in enumerate(values)
+        ]
+    
+    @staticmethod
+    def _is_token(stored: Union[bytes, str]) -> bool:
+        """
+        Check for the Fernet token prefix. Text setting values are checked
+        and decrypted as str (Fernet accepts both), without a bytes copy.
+        """
+        if isinstance(stored, str):
+            return stored.startswith(FERNET_TOKEN_TEXT_PREFIX)
+        return stored.startswith(FERNET_TOKEN_PREFIX)
+    
+    @staticmethod
+    def _load_field(stored: Union[bytes, str], decrypted: Optional[bytes]) -> Any:
+        """Parse a stored field, given its plaintext if it was decrypted."""
+        if decrypted is not None:
+            try:
+                return json_loads(decrypted)
+            except JSONDecodeError:
+                return decrypted.decode()
+        
+        # Plain (unencrypted) value: parse as regular JSON
         try:
-            return json.loads(encrypted_hex)
-        except json.JSONDecodeError:
-            return encrypted_hex
+            return json_loads(stored)
+        except (JSONDecodeError, UnicodeDecodeError):
+            return stored.decode(errors='replace') if isinstance(stored, bytes) else stored
     
     def create_account(self, name: str, account_type: str, broker: str = None,
                       currency: str = 'EUR', initial_balance: float = 0.0) -> int:
@@ -273,7 +544,8 @@ class DatabaseManager:
             
             # Store basic metadata (non-sensitive)
             if broker:
-                metadata = {"broker_details": broker, "created_via": "app"}
+                # Fixed-shape JSON; only the broker string needs serializing
+                metadata = b'{"broker_details":' + json_dumps(broker) + b',"created_via":"app"}'
                 account.metadata_encrypted = self.encrypt_field(metadata)
             
             session.add(account)
@@ -282,19 +554,78 @@ class DatabaseManager:
             print(f"Created account: {name} (ID: {account_id})")
             return account_id
     
+    def create_transactions(self, rows: List[Dict]) -> List[int]:
+        """
+        Create many transactions in a single session and statement.
+        Each row holds Transaction column values; an optional "metadata"
+        entry is encrypted into metadata_encrypted.
+        Returns the new transaction IDs in row order.
+        """
+        if not self._initialized:
+            raise RuntimeError("Database not initialized")
+        
+        if not rows:
+            return []
+        
+        prepared = self._prepare_transaction_rows(rows)
+        with self.get_session() as session:
+            # Executemany with RETURNING (SQLite 3.35+), IDs come back in row order
+            transaction_ids = list(session.scalars(
+                insert(Transaction).returning(Transaction.id, sort_by_parameter_order=True),
+                prepared
+            ))
+            print(f"Created {len(transaction_ids)} transactions")
+            return transaction_ids
+    
+    def bulk_insert_transactions(self, rows: List[Dict]) -> int:
+        """
+        Insert many transactions when their IDs are not needed, e.g. imports.
+        Takes the same rows as create_transactions but skips RETURNING, so
+        SQLAlchemy batches rows into multi-VALUES INSERTs.
+        Returns the number of rows inserted.
+        """
+        if not self._initialized:
+            raise RuntimeError("Database not initialized")
+        
+        if not rows:
+            return 0
+        
+        prepared = self._prepare_transaction_rows(rows)
+        with self.get_session() as session:
+            session.execute(insert(Transaction), prepared)
+            print(f"Inserted {len(prepared)} transactions")
+            return len(prepared)
+    
+    def _prepare_transaction_rows(self, rows: List[Dict]) -> List[Dict]:
+        """Copy transaction rows, encrypting any "metadata" entry in one pass."""
+        prepared = []
+        for row in rows:
+            row = dict(row)
+            metadata = row.pop("metadata", None)
+            if metadata is not None:
+                row["metadata_encrypted"] = self.encrypt_field(metadata)
+            prepared.append(row)
+        return prepared
+    
     def get_accounts(self, active_only: bool = True) -> List[Dict]:
-        """Get all accounts."""
+        """Get all accounts. Timestamps are returned as datetime objects."""
         if not self._initialized:
             return []
             
         try:
-            with self.get_session() as session:
-                query = session.query(Account)
-                if active_only:
-                    query = query.filter(Account.is_active == True)
+            with self.get_readonly_session() as session:
+                query = _ACTIVE_ACCOUNTS if active_only else _ALL_ACCOUNTS
+                rows = session.execute(query).all()
+                
+                # Decrypt all metadata in one batch
+                try:
+                    metadata = self.decrypt_fields([acc.metadata_encrypted for acc in rows])
+                except Exception as e:
+                    print(f"Could not decrypt account metadata: {e}")
+                    metadata = [None] * len(rows)
                 
                 accounts = []
-                for acc in query.all():
+                for acc, acc_metadata in zip(rows, metadata):
                     account_dict = {
                         'id': acc.id,
                         'name': acc.name,
@@ -302,16 +633,12 @@ class DatabaseManager:
                         'broker': acc.broker,
                         'currency': acc.currency,
                         'initial_balance': acc.initial_balance,
-                        'created_at': acc.created_at.isoformat() if acc.created_at else None,
+                        'created_at': acc.created_at,
                         'is_active': acc.is_active
                     }
                     
-                    # Decrypt metadata if present
-                    if acc.metadata_encrypted:
-                        try:
-                            account_dict['metadata'] = self.decrypt_field(acc.metadata_encrypted)
-                        except Exception as e:
-                            print(f"Could not decrypt metadata for account {acc.id}: {e}")
+                    if acc_metadata is not None:
+                        account_dict['metadata'] = acc_metadata
                     
                     accounts.append(account_dict)
                 
@@ -322,59 +649,165 @@ class DatabaseManager:
             print(f"Failed to get accounts: {e}")
             return []
     
-    def save_setting(self, key: str, value: Any, encrypted: bool = False) -> bool:
-        """Save a setting to the database."""
+    def get_account_with_transactions(self, account_id: int) -> Optional[Dict]:
+        """
+        Get an account together with its transactions.
+        Timestamps are returned as datetime objects.
+        Transactions and their assets are loaded in one batched query each.
+        """
         if not self._initialized:
-            print("Cannot save setting: database not initialized")
-            return False
+            return None
             
         try:
-            with self.get_session() as session:
-                # Check if setting exists
-                setting = session.query(Settings).filter_by(key=key).first()
+            with self.get_readonly_session() as session:
+                query = (
+                    select(Account)
+                    .where(Account.id == account_id)
+                    .options(selectinload(Account.transactions))
+                )
+                account = session.scalars(query).first()
+                if account is None:
+                    return None
                 
-                # Prepare value
-                if encrypted:
-                    value_str = self.encrypt_field(value)
-                else:
-                    value_str = json.dumps(value) if not isinstance(value, str) else value
+                tx_metadata = self.decrypt_fields(
+                    [tx.metadata_encrypted for tx in account.transactions]
+                )
                 
-                if setting:
-                    setting.value = value_str
-                    setting.encrypted = encrypted
-                    setting.updated_at = datetime.utcnow()
-                else:
-                    setting = Settings(
-                        key=key,
-                        value=value_str,
-                        encrypted=encrypted
-                    )
-                    session.add(setting)
+                transactions = []
+                for tx, metadata in zip(account.transactions, tx_metadata):
+                    tx_dict = {
+                        'id': tx.id,
+                        'asset_id': tx.asset_id,
+                        'symbol': tx.asset.symbol if tx.asset else None,
+                        'type': tx.transaction_type,
+                        'quantity': tx.quantity,
+                        'price': tx.price,
+                        'total_amount': tx.total_amount,
+                        'currency': tx.currency,
+                        'fee': tx.fee,
+                        'transaction_date': tx.transaction_date,
+                        'notes': tx.notes
+                    }
+                    if metadata is not None:
+                        tx_dict['metadata'] = metadata
+                    transactions.append(tx_dict)
+                
+                account_dict = {
+                    'id': account.id,
+                    'name': account.name,
+                    'type': account.account_type,
+                    'broker': account.broker,
+                    'currency': account.currency,
+                    'initial_balance': account.initial_balance,
+                    'created_at': account.created_at,
+                    'is_active': account.is_active,
+                    'transactions': transactions
+                }
+                if account.metadata_encrypted:
+                    account_dict['metadata'] = self.decrypt_field(account.metadata_encrypted)
                 
+                return account_dict
+                
+        except Exception as e:
+            print(f"Failed to get account {account_id}: {e}")
+            return None
+    
+    def save_setting(self, key: str, value: Any, encrypted: bool = False,
+                     session: Optional[Session] = None) -> bool:
+        """
+        Save a setting to the database.
+        Pass a session to write as part of the caller's transaction.
+        """
+        if not self._initialized:
+            print("Cannot save setting: database not initialized")
+            return False
+            
+        try:
+            # Prepare value (Fernet tokens are already text-safe)
+            if encrypted:
+                token = self.encrypt_field(value)
+                # None is stored as NULL, as encrypt_field has nothing to encrypt
+                value_str = token.decode() if token is not None else None
+            else:
+                value_str = self._serialize_setting(value)
+            
+            # Insert or update in one statement
+            params = {"key": key, "value": value_str, "encrypted": encrypted}
+            ticket = self._invalidate_setting(key)
+            if session is not None:
+                # Committed by the caller, possibly never; leave the key uncached
+                session.execute(_UPSERT_SETTING, params)
                 return True
+            
+            try:
+                with self.get_session() as session:
+                    session.execute(_UPSERT_SETTING, params)
+            except Exception:
+                self._invalidate_setting(key)
+                raise
+            
+            # Committed: write through unless another write started meanwhile.
+            # Bumping the generation again discards reads that began before
+            # the commit, which may hold the old row.
+            with self._setting_cache_lock:
+                if ticket == self._setting_generation:
+                    self._setting_cache[key] = (value_str, encrypted)
+                else:
+                    self._setting_cache.pop(key, None)
+                self._setting_generation += 1
+            return True
         except Exception as e:
             print(f"Failed to save setting {key}: {e}")
             return False
     
+    def _invalidate_setting(self, key: Optional[str] = None) -> int:
+        """
+        Drop a cached setting, or all of them when no key is given.
+        Returns the new cache generation.
+        """
+        with self._setting_cache_lock:
+            if key is None:
+                self._setting_cache.clear()
+            else:
+                self._setting_cache.pop(key, None)
+            self._setting_generation += 1
+            return self._setting_generation
+    
+    @staticmethod
+    def _serialize_setting(value: Any) -> str:
+        """Serialize an unencrypted setting value for storage."""
+        return json_dumps(value).decode() if not isinstance(value, str) else value
+    
     def get_setting(self, key: str, default: Any = None) -> Any:
         """Get a setting from the database."""
         if not self._initialized:
             return default
             
         try:
-            with self.get_session() as session:
-                setting = session.query(Settings).filter_by(key=key).first()
+            setting = self._setting_cache.get(key)
+            if setting is None:
+                generation = self._setting_generation
+                with self.get_readonly_session() as session:
+                    setting = session.execute(_SETTING_BY_KEY, {"key": key}).first()
                 
+                # Missing keys are not cached so the caller's default applies
                 if not setting:
                     return default
                 
-                if setting.encrypted:
-                    return self.decrypt_field(setting.value)
-                else:
-                    try:
-                        return json.loads(setting.value)
-                    except json.JSONDecodeError:
-                        return setting.value
+                setting = tuple(setting)
+                with self._setting_cache_lock:
+                    # Skip if a write happened meanwhile; the row may be stale
+                    if generation == self._setting_generation:
+                        self._setting_cache[key] = setting
+            
+            value, encrypted = setting
+            if encrypted:
+                return self.decrypt_field(value)
+            else:
+                try:
+                    return json_loads(value)
+                except JSONDecodeError:
+                    return value
         except Exception as e:
             print(f"Failed to get setting {key}: {e}")
             return default
@@ -385,25 +818,22 @@ class DatabaseManager:
             return False
             
         try:
-            with self.get_session() as session:
+            with self.get_readonly_session() as session:
                 # Run integrity check
-                result = session.execute(text("PRAGMA integrity_check"))
+                result = session.execute(_INTEGRITY_CHECK)
                 integrity = result.scalar()
                 
                 if integrity != "ok":
                     print(f"Database integrity check failed: {integrity}")
                     return False
                 
-                # Check table existence
+                # Check table existence in one query
                 tables = ['accounts', 'assets', 'transactions', 'portfolio_snapshots', 'settings']
-                for table in tables:
-                    result = session.execute(
-                        text("SELECT name FROM sqlite_master WHERE type='table' AND name=:name"),
-                        {"name": table}
-                    )
-                    if not result.scalar():
-                        print(f"Table {table} missing")
-                        return False
+                existing = set(session.execute(_EXISTING_TABLES, {"names": tables}).scalars())
+                missing = [table for table in tables if table not in existing]
+                if missing:
+                    print(f"Tables missing: {', '.join(missing)}")
+                    return False
                 
                 return True
                 
@@ -412,7 +842,13 @@ class DatabaseManager:
             return False
     
     def backup_database(self) -> Optional[Path]:
-        """Create a backup of the database."""
+        """
+        Create a backup of the database.
+        When authenticated the backup is encrypted. The snapshot is then held
+        in memory, so peak memory is about one database size: SQLite's backup
+        API only writes to a database, and the alternative would put an
+        unencrypted copy on disk. Plain backups go straight to the file.
+        """
         try:
             if not self.config.DB_PATH.exists():
                 return None
@@ -424,26 +860,33 @@ class DatabaseManager:
             # Ensure backup directory exists
             backup_path.parent.mkdir(parents=True, exist_ok=True)
             
+            # Encrypted backups are copied into memory and encrypted from
+            # there, so no unencrypted copy is ever written to disk; this
+            # costs O(database size) memory, unlike the chunked encryption
+            encrypt = self.security.is_authenticated()
+            
             # Create backup using SQLite backup API
             source = sqlite3.connect(str(self.config.DB_PATH))
-            dest = sqlite3.connect(str(backup_path))
-            
-            with dest:
-                source.backup(dest)
-            
-            source.close()
-            dest.close()
+            dest = sqlite3.connect(":memory:" if encrypt else str(backup_path))
+            try:
+                # Copy in steps so writers are not locked out for the whole copy
+                with dest:
+                    source.backup(dest, pages=BACKUP_PAGES_PER_STEP, sleep=0)
+                snapshot = dest.serialize() if encrypt else None
+            finally:
+                # Closing frees the in-memory copy before the snapshot is encrypted
+                source.close()
+                dest.close()
             
-            # Encrypt the backup if authenticated
-            if self.security.is_authenticated():
+            if encrypt:
                 try:
-                    encrypted_backup = self.security.encrypt_file(backup_path)
-                    backup_path.unlink()  # Remove unencrypted backup
-                    return encrypted_backup
+                    encrypted_path = backup_path.with_suffix(backup_path.suffix + '.enc')
+                    # BytesIO shares the snapshot buffer; chunks add one chunk of memory
+                    return self.security.encrypt_stream(io.BytesIO(snapshot), encrypted_path)
                 except Exception as e:
                     print(f"Could not encrypt backup: {e}")
-                    # Return unencrypted backup
-                    return backup_path
+                    # Fall back to an unencrypted backup
+                    backup_path.write_bytes(snapshot)
             
             return backup_path
             
@@ -454,34 +897,106 @@ class DatabaseManager:
     def _is_first_db_run(self) -> bool:
         """Check if this is the first database run."""
         try:
-            with self.get_session() as session:
-                count = session.query(Settings).count()
-                return count == 0
+            with self.get_readonly_session() as session:
+                return session.execute(_ANY_SETTING).first() is None
         except Exception:
             return True
     
+    def _migrate(self):
+        """Upgrade data written by older versions of the application."""
+        with self.get_session() as session:
+            version = session.execute(
+                select(Settings.value).where(Settings.key == "db_version")
+            ).scalar()
+            if version == DB_VERSION:
+                return
+            
+            if version in (None, "1.0"):
+                self._migrate_hex_ciphertext(session)
+            
+            # Upsert: databases from before 1.1 may have no version row at all
+            session.execute(
+                _UPSERT_SETTING,
+                {"key": "db_version", "value": DB_VERSION, "encrypted": False}
+            )
+            self._invalidate_setting()
+            print(f"Database migrated from version {version} to {DB_VERSION}")
+    
+    def _migrate_hex_ciphertext(self, session: Session):
+        """
+        Convert 1.0 data, which stored hex-encoded text, to the 1.1 format.
+        Metadata columns become raw bytes; encrypted settings keep the
+        Fernet token text without the hex layer.
+        """
+        for model in (Account, Asset, Transaction, PortfolioSnapshot):
+            table = model.__table__
+            rows = session.execute(
+                select(table.c.id, table.c.metadata_encrypted)
+                .where(func.typeof(table.c.metadata_encrypted) == 'text')
+            ).all()
+            for row_id, value in rows:
+                session.execute(
+                    update(table).where(table.c.id == row_id)
+                    .values(metadata_encrypted=self._legacy_to_bytes(value))
+                )
+        
+        rows = session.execute(
+            select(Settings.key, Settings.value)
+            .where(Settings.encrypted == True, Settings.value.isnot(None))
+        ).all()
+        for key, value in rows:
+            session.execute(
+                update(Settings).where(Settings.key == key)
+                .values(value=self._legacy_to_bytes(value).decode())
+            )
+    
+    @staticmethod
+    def _legacy_to_bytes(value: Any) -> bytes:
+        """Convert a 1.0 stored value (hex-encoded token or plain JSON) to bytes."""
+        if isinstance(value, bytes):
+            return value
+        try:
+            token = bytes.fromhex(value)
+            if token.startswith(FERNET_TOKEN_PREFIX):
+                return token
+        except ValueError:
+            pass
+        return value.encode()
+    
     def _initialize_defaults(self):
-        """Initialize default settings on first run."""
+        """Initialize default settings on first run, in a single transaction."""
         defaults = {
             "app_version": self.config.APP_VERSION,
-            "db_version": "1.0",
-            "first_run_date": datetime.utcnow().isoformat(),
+            "db_version": DB_VERSION,
+            "first_run_date": datetime.now(timezone.utc).isoformat(),
             "theme": self.config.THEME_MODE,
             "currency_primary": "EUR",
             "currency_secondary": "USD"
         }
         
-        for key, value in defaults.items():
-            self.save_setting(key, value)
+        rows = [
+            {"key": key, "value": self._serialize_setting(value), "encrypted": False}
+            for key, value in defaults.items()
+        ]
+        
+        with self.get_session() as session:
+            # Databases created before defaults were stored have no settings
+            # but may hold 1.0 data
+            self._migrate_hex_ciphertext(session)
+            session.execute(insert(Settings), rows)
 
 
 # Singleton instance
 _db_manager: Optional[DatabaseManager] = None
+_db_manager_lock = threading.Lock()
 
 
 def get_db_manager() -> DatabaseManager:
-    """Get or create the database manager singleton."""
+    """Get or create the database manager singleton (thread-safe)."""
     global _db_manager
     if _db_manager is None:
-        _db_manager = DatabaseManager()
+        with _db_manager_lock:
+            # Another thread may have created it while we waited
+            if _db_manager is None:
+                _db_manager = DatabaseManager()
     return _db_manager
\ No newline at end of file
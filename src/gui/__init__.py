@@ -1 +1,8 @@
-# Auto-generated __init__.py
+"""Flet views of the application."""
+
+from src._lazy import lazy_exports
+
+__getattr__, __all__ = lazy_exports(__name__, {
+    'DashboardView': '.dashboard',
+    'CreateAccountDialog': '.dashboard',
+})
@@ -3,20 +3,57 @@ Dashboard view for the Portfolio Tracker.
 Main interface showing portfolio overview and navigation.
 """
 
+import asyncio
+import re
 import flet as ft
-from datetime import datetime
+from contextlib import contextmanager
 from typing import Optional, List, Dict
 
 from src.utils.config import get_config, COLORS
 from src.core.database import get_db_manager
 
 
+# Account list layout; every card has the same height so the list can
+# skip measuring them
+ACCOUNT_CARD_HEIGHT = 90
+ACCOUNT_CARD_SPACING = 10
+MAX_VISIBLE_ACCOUNT_CARDS = 6
+
+# Card icon per account type
+_TYPE_ICONS = {
+    "stocks": ft.Icons.SHOW_CHART,
+    "crypto": ft.Icons.CURRENCY_BITCOIN,
+    "mixed": ft.Icons.ACCOUNT_BALANCE_WALLET,
+}
+
+# Plain decimal amounts accepted as an initial balance
+_AMOUNT_RE = re.compile(r'-?(?:\d+(?:\.\d*)?|\.\d+)')
+
+# Navigation rail destinations: (icon, selected icon, label)
+_NAV_DESTINATIONS = (
+    (ft.Icons.DASHBOARD_OUTLINED, ft.Icons.DASHBOARD, "Dashboard"),
+    (ft.Icons.SHOW_CHART_OUTLINED, ft.Icons.SHOW_CHART, "Stocks & ETFs"),
+    (ft.Icons.CURRENCY_BITCOIN, ft.Icons.CURRENCY_BITCOIN, "Crypto"),
+    (ft.Icons.RECEIPT_LONG_OUTLINED, ft.Icons.RECEIPT_LONG, "Transactions"),
+    (ft.Icons.ANALYTICS_OUTLINED, ft.Icons.ANALYTICS, "Analytics"),
+)
+
+# Quick stats cards: (label, initial value, icon)
+_STATS = (
+    ("Accounts", "0", ft.Icons.ACCOUNT_BALANCE),
+    ("Assets", "0", ft.Icons.PIE_CHART),
+    ("24h Change", "0.00%", ft.Icons.TRENDING_UP),
+    ("Total P&L", "€0.00", ft.Icons.ATTACH_MONEY),
+)
+
+
 class CreateAccountDialog:
     """Dialog for creating new accounts/depots."""
     
-    def __init__(self, page: ft.Page, on_create_callback):
+    def __init__(self, page: ft.Page, on_create_callback, toast):
         self.page = page
         self.on_create = on_create_callback
+        self.toast = toast
         self.db = get_db_manager()
         
         # Form fields
@@ -126,8 +163,11 @@ class CreateAccountDialog:
         self.dialog.open = True
         self.page.update()
     
-    def handle_create(self, e):
-        """Handle account creation."""
+    async def handle_create(self, e):
+        """
+        Handle account creation.
+        Database work runs in a worker thread so the UI stays responsive.
+        """
         # Validate inputs
         name = self.name_field.value
         if not name:
@@ -138,15 +178,16 @@ class CreateAccountDialog:
         broker = self.broker_field.value or None
         currency = self.currency_dropdown.value
         
-        try:
-            initial_balance = float(self.initial_balance_field.value or 0)
-        except ValueError:
+        balance_text = (self.initial_balance_field.value or "0").strip()
+        if not _AMOUNT_RE.fullmatch(balance_text):
             self.show_error("Invalid initial balance")
             return
+        initial_balance = float(balance_text)
         
         # Create account in database
         try:
-            account_id = self.db.create_account(
+            account_id = await asyncio.to_thread(
+                self.db.create_account,
                 name=name,
                 account_type=account_type,
                 broker=broker,
@@ -156,15 +197,10 @@ class CreateAccountDialog:
             
             # Close dialog and refresh
             self.close_dialog(e)
-            self.on_create()
+            await self.on_create()
             
             # Show success message
-            self.page.snack_bar = ft.SnackBar(
-                content=ft.Text(f"Account '{name}' created successfully!"),
-                bgcolor=COLORS["success"]
-            )
-            self.page.snack_bar.open = True
-            self.page.update()
+            self.toast(f"Account '{name}' created successfully!", COLORS["success"])
             
         except Exception as ex:
             self.show_error(f"Failed to create account: {str(ex)}")
@@ -172,16 +208,11 @@ class CreateAccountDialog:
     def close_dialog(self, e):
         """Close the dialog."""
         self.dialog.open = False
-        self.page.update()
+        self.dialog.update()
     
     def show_error(self, message: str):
         """Show error message."""
-        self.page.snack_bar = ft.SnackBar(
-            content=ft.Text(message),
-            bgcolor=COLORS["error"]
-        )
-        self.page.snack_bar.open = True
-        self.page.update()
+        self.toast(message, COLORS["error"])
 
 
 class DashboardView:
@@ -195,9 +226,49 @@ class DashboardView:
         
         # UI components
         self.accounts_container = None
+        self.empty_state = None
         self.portfolio_value_text = None
         self.nav_rail = None
         
+        # Set while a batch_update() block collects changes
+        self._batching = False
+        
+        # Accounts as last read from the database; None until loaded
+        self._accounts_cache: Optional[List[Dict]] = None
+        
+        # Accounts shown in the list, looked up by the card buttons
+        self._account_by_id: Dict[int, Dict] = {}
+        
+        # Cards kept across refreshes, and their changeable controls
+        self._card_by_id: Dict[int, ft.Container] = {}
+        self._card_refs_by_id: Dict[int, Dict[str, ft.Control]] = {}
+        
+    @contextmanager
+    def batch_update(self):
+        """
+        Collect control changes and send them in a single page update.
+        Updates requested inside the block are deferred to its end.
+        """
+        if self._batching:
+            # Nested batch: the outermost block flushes
+            yield
+            return
+        
+        self._batching = True
+        try:
+            yield
+        finally:
+            self._batching = False
+            if self.page:
+                self.page.update()
+    
+    def show_message(self, message: str, color: str):
+        """
+        Show a notification in the app's shared snack bar.
+        Inside a batch_update() block it goes out with the batch.
+        """
+        self.app.toast(message, color, update=not self._batching)
+    
     def build(self) -> ft.View:
         """Build the dashboard view."""
         # Create navigation rail
@@ -225,64 +296,63 @@ class DashboardView:
         )
     
     def create_app_bar(self) -> ft.AppBar:
-        """Create the application bar."""
-        return ft.AppBar(
-            title=ft.Text(
-                self.config.APP_NAME,
-                color=COLORS["on_surface"]
-            ),
-            bgcolor=COLORS["surface"],
-            actions=[
-                ft.IconButton(
-                    icon=ft.Icons.SETTINGS,
-                    icon_color=COLORS["on_surface_variant"],
-                    tooltip="Settings",
-                    on_click=lambda _: self.show_settings()
+        """
+        Create the application bar.
+        Built once per app and reused when the dashboard is shown again.
+        """
+        app_bar = self.app.dashboard_chrome.get("app_bar")
+        if app_bar is None:
+            app_bar = ft.AppBar(
+                title=ft.Text(
+                    self.config.APP_NAME,
+                    color=COLORS["on_surface"]
                 ),
-                ft.IconButton(
-                    icon=ft.Icons.LOGOUT,
-                    icon_color=COLORS["on_surface_variant"],
-                    tooltip="Logout",
-                    on_click=lambda _: self.app.handle_logout()
-                ),
-            ],
-        )
+                bgcolor=COLORS["surface"],
+                actions=[
+                    ft.IconButton(
+                        icon=ft.Icons.SETTINGS,
+                        icon_color=COLORS["on_surface_variant"],
+                        tooltip="Settings",
+                    ),
+                    ft.IconButton(
+                        icon=ft.Icons.LOGOUT,
+                        icon_color=COLORS["on_surface_variant"],
+                        tooltip="Logout",
+                    ),
+                ],
+            )
+            self.app.dashboard_chrome["app_bar"] = app_bar
+        
+        # Point the handlers at this view
+        settings_button, logout_button = app_bar.actions
+        settings_button.on_click = lambda _: self.show_settings()
+        logout_button.on_click = lambda _: self.app.handle_logout()
+        return app_bar
     
     def create_navigation_rail(self) -> ft.NavigationRail:
-        """Create the navigation rail."""
-        return ft.NavigationRail(
-            selected_index=0,
-            label_type=ft.NavigationRailLabelType.ALL,
-            bgcolor=COLORS["surface"],
-            destinations=[
-                ft.NavigationRailDestination(
-                    icon=ft.Icons.DASHBOARD_OUTLINED,
-                    selected_icon=ft.Icons.DASHBOARD,
-                    label="Dashboard",
-                ),
-                ft.NavigationRailDestination(
-                    icon=ft.Icons.SHOW_CHART_OUTLINED,
-                    selected_icon=ft.Icons.SHOW_CHART,
-                    label="Stocks & ETFs",
-                ),
-                ft.NavigationRailDestination(
-                    icon=ft.Icons.CURRENCY_BITCOIN,
-                    selected_icon=ft.Icons.CURRENCY_BITCOIN,
-                    label="Crypto",
-                ),
-                ft.NavigationRailDestination(
-                    icon=ft.Icons.RECEIPT_LONG_OUTLINED,
-                    selected_icon=ft.Icons.RECEIPT_LONG,
-                    label="Transactions",
-                ),
-                ft.NavigationRailDestination(
-                    icon=ft.Icons.ANALYTICS_OUTLINED,
-                    selected_icon=ft.Icons.ANALYTICS,
-                    label="Analytics",
-                ),
-            ],
-            on_change=self.handle_navigation,
-        )
+        """
+        Create the navigation rail.
+        Built once per app and reused when the dashboard is shown again.
+        """
+        nav_rail = self.app.dashboard_chrome.get("nav_rail")
+        if nav_rail is None:
+            nav_rail = ft.NavigationRail(
+                label_type=ft.NavigationRailLabelType.ALL,
+                bgcolor=COLORS["surface"],
+                destinations=[
+                    ft.NavigationRailDestination(
+                        icon=icon,
+                        selected_icon=selected_icon,
+                        label=label,
+                    )
+                    for icon, selected_icon, label in _NAV_DESTINATIONS
+                ],
+            )
+            self.app.dashboard_chrome["nav_rail"] = nav_rail
+        
+        nav_rail.selected_index = 0
+        nav_rail.on_change = self.handle_navigation
+        return nav_rail
     
     def create_main_content(self) -> ft.Container:
         """Create the main dashboard content."""
@@ -352,23 +422,16 @@ class DashboardView:
     
     def create_stats_row(self) -> ft.Row:
         """Create quick statistics row."""
-        stats = [
-            {"label": "Accounts", "value": "0", "icon": ft.Icons.ACCOUNT_BALANCE},
-            {"label": "Assets", "value": "0", "icon": ft.Icons.PIE_CHART},
-            {"label": "24h Change", "value": "0.00%", "icon": ft.Icons.TRENDING_UP},
-            {"label": "Total P&L", "value": "€0.00", "icon": ft.Icons.ATTACH_MONEY},
-        ]
-        
         cards = []
-        for stat in stats:
+        for label, value, icon in _STATS:
             card = ft.Container(
                 content=ft.Column([
                     ft.Row([
-                        ft.Icon(stat["icon"], color=COLORS["primary"], size=20),
-                        ft.Text(stat["label"], size=12, color=COLORS["on_surface_variant"])
+                        ft.Icon(icon, color=COLORS["primary"], size=20),
+                        ft.Text(label, size=12, color=COLORS["on_surface_variant"])
                     ]),
                     ft.Text(
-                        stat["value"],
+                        value,
                         size=24,
                         weight=ft.FontWeight.BOLD,
                         color=COLORS["on_surface"]
@@ -403,101 +466,167 @@ class DashboardView:
             )
         ])
         
-        # Accounts container
-        self.accounts_container = ft.Column(
-            spacing=10,
+        # Accounts list; with a fixed item extent Flet only lays out and
+        # paints the cards scrolled into view
+        self.accounts_container = ft.ListView(
+            spacing=ACCOUNT_CARD_SPACING,
+            item_extent=ACCOUNT_CARD_HEIGHT,
+            visible=False,
         )
+        self.empty_state = self.create_empty_state()
         
-        # Load existing accounts
-        self.refresh_accounts()
+        # Accounts are loaded by refresh_accounts_async() once the view is
+        # shown; the list and empty state stay hidden until then
         
         return ft.Container(
             content=ft.Column([
                 header,
                 ft.Container(height=10),
+                self.empty_state,
                 self.accounts_container
             ]),
             expand=True
         )
     
+    def create_empty_state(self) -> ft.Container:
+        """Create the placeholder shown while there are no accounts."""
+        return ft.Container(
+            content=ft.Column([
+                ft.Icon(
+                    ft.Icons.ACCOUNT_BALANCE_WALLET,
+                    color=COLORS["on_surface_variant"],
+                    size=64
+                ),
+                ft.Container(height=10),
+                ft.Text(
+                    "No accounts yet",
+                    size=18,
+                    color=COLORS["on_surface_variant"]
+                ),
+                ft.Text(
+                    "Create your first account to start tracking your portfolio",
+                    size=14,
+                    color=COLORS["on_surface_variant"],
+                    text_align=ft.TextAlign.CENTER
+                ),
+            ],
+            horizontal_alignment=ft.CrossAxisAlignment.CENTER,
+            ),
+            padding=40,
+            bgcolor=COLORS["surface"],
+            border_radius=10,
+            alignment=ft.alignment.center,
+            visible=False,
+        )
+    
     def refresh_accounts(self):
         """Refresh the accounts list."""
-        self.accounts_container.controls.clear()
-        
-        # Get accounts from database
-        accounts = self.db.get_accounts()
-        
-        if not accounts:
-            # Show empty state
-            empty_state = ft.Container(
-                content=ft.Column([
-                    ft.Icon(
-                        ft.Icons.ACCOUNT_BALANCE_WALLET,
-                        color=COLORS["on_surface_variant"],
-                        size=64
-                    ),
-                    ft.Container(height=10),
-                    ft.Text(
-                        "No accounts yet",
-                        size=18,
-                        color=COLORS["on_surface_variant"]
-                    ),
-                    ft.Text(
-                        "Create your first account to start tracking your portfolio",
-                        size=14,
-                        color=COLORS["on_surface_variant"],
-                        text_align=ft.TextAlign.CENTER
-                    ),
-                ],
-                horizontal_alignment=ft.CrossAxisAlignment.CENTER,
-                ),
-                padding=40,
-                bgcolor=COLORS["surface"],
-                border_radius=10,
-                alignment=ft.alignment.center,
+        with self.batch_update():
+            self._rebuild_accounts()
+    
+    def get_accounts(self) -> List[Dict]:
+        """Get the accounts, reading the database only after a change."""
+        if self._accounts_cache is None:
+            self._accounts_cache = self._add_display_lines(self.db.get_accounts())
+        return self._accounts_cache
+    
+    @staticmethod
+    def _add_display_lines(accounts: List[Dict]) -> List[Dict]:
+        """
+        Format the card text lines once per load.
+        Cards read them instead of formatting on every refresh.
+        """
+        for account in accounts:
+            currency = account['currency']
+            account['details_line'] = (
+                f"{account['type'].title()} • {currency} • "
+                f"Balance: {currency} {account['initial_balance']:.2f}"
             )
-            self.accounts_container.controls.append(empty_state)
-        else:
-            # Show account cards
-            for account in accounts:
+            account['broker_line'] = f"Broker: {account['broker'] or 'Not specified'}"
+        return accounts
+    
+    async def on_accounts_changed(self):
+        """Drop the cached accounts after a mutation and redraw the list."""
+        self._accounts_cache = None
+        await self.refresh_accounts_async()
+    
+    async def refresh_accounts_async(self):
+        """
+        Refresh the accounts list, loading them in a worker thread.
+        Uses the accounts prefetched at login when they are pending.
+        """
+        if self._accounts_cache is None:
+            prefetch = self.app.take_accounts_prefetch()
+            if prefetch is not None:
+                accounts = await asyncio.wrap_future(prefetch)
+                self._accounts_cache = self._add_display_lines(accounts)
+        await asyncio.to_thread(self.get_accounts)
+        self.refresh_accounts()
+    
+    def _rebuild_accounts(self):
+        """
+        Bring the account cards and stats up to date.
+        Cards are matched by account id: existing ones are updated in place,
+        so only new accounts create controls.
+        """
+        accounts = self.get_accounts()
+        
+        # Show the empty state or the account cards
+        self.empty_state.visible = not accounts
+        self.accounts_container.visible = bool(accounts)
+        self._account_by_id = {account['id']: account for account in accounts}
+        
+        # Forget cards of accounts that are gone
+        for account_id in self._card_by_id.keys() - self._account_by_id.keys():
+            del self._card_by_id[account_id]
+            del self._card_refs_by_id[account_id]
+        
+        cards = []
+        for account in accounts:
+            card = self._card_by_id.get(account['id'])
+            if card is None:
                 card = self.create_account_card(account)
-                self.accounts_container.controls.append(card)
+            else:
+                self._fill_account_card(account)
+            cards.append(card)
+        self.accounts_container.controls = cards
+        
+        # The list sits in a scrolling page, so it needs a bounded height;
+        # it grows with the accounts and scrolls on its own past the limit
+        visible_cards = min(len(accounts), MAX_VISIBLE_ACCOUNT_CARDS)
+        self.accounts_container.height = max(
+            0, visible_cards * (ACCOUNT_CARD_HEIGHT + ACCOUNT_CARD_SPACING) - ACCOUNT_CARD_SPACING
+        )
         
         # Update stats
         self.update_stats(len(accounts))
-        
-        if self.page:
-            self.page.update()
     
     def create_account_card(self, account: Dict) -> ft.Container:
-        """Create an account card."""
-        # Determine icon based on account type
-        icon = ft.Icons.SHOW_CHART
-        if account['type'] == 'crypto':
-            icon = ft.Icons.CURRENCY_BITCOIN
-        elif account['type'] == 'mixed':
-            icon = ft.Icons.ACCOUNT_BALANCE_WALLET
+        """Create an account card and register it for later updates."""
+        refs = {
+            "icon": ft.Icon(color=COLORS["primary"], size=32),
+            "name": ft.Text(
+                size=16,
+                weight=ft.FontWeight.BOLD,
+                color=COLORS["on_surface"]
+            ),
+            "details": ft.Text(
+                size=12,
+                color=COLORS["on_surface_variant"]
+            ),
+            "broker": ft.Text(
+                size=11,
+                color=COLORS["on_surface_variant"]
+            ),
+        }
         
-        return ft.Container(
+        card = ft.Container(
             content=ft.Row([
-                ft.Icon(icon, color=COLORS["primary"], size=32),
+                refs["icon"],
                 ft.Column([
-                    ft.Text(
-                        account['name'],
-                        size=16,
-                        weight=ft.FontWeight.BOLD,
-                        color=COLORS["on_surface"]
-                    ),
-                    ft.Text(
-                        f"{account['type'].title()} • {account['currency']} • Balance: {account['currency']} {account['initial_balance']:.2f}",
-                        size=12,
-                        color=COLORS["on_surface_variant"]
-                    ),
-                    ft.Text(
-                        f"Broker: {account['broker'] or 'Not specified'}",
-                        size=11,
-                        color=COLORS["on_surface_variant"]
-                    ),
+                    refs["name"],
+                    refs["details"],
+                    refs["broker"],
                 ],
                 expand=True
                 ),
@@ -505,19 +634,44 @@ class DashboardView:
                     icon=ft.Icons.EDIT,
                     icon_color=COLORS["on_surface_variant"],
                     tooltip="Edit Account",
-                    on_click=lambda _, acc=account: self.edit_account(acc)
+                    data=account['id'],
+                    on_click=self._on_edit_click
                 ),
                 ft.IconButton(
                     icon=ft.Icons.DELETE,
                     icon_color=COLORS["error"],
                     tooltip="Delete Account",
-                    on_click=lambda _, acc=account: self.delete_account(acc)
+                    data=account['id'],
+                    on_click=self._on_delete_click
                 ),
             ]),
             padding=15,
+            height=ACCOUNT_CARD_HEIGHT,
             bgcolor=COLORS["surface"],
             border_radius=8,
         )
+        
+        self._card_by_id[account['id']] = card
+        self._card_refs_by_id[account['id']] = refs
+        self._fill_account_card(account)
+        return card
+    
+    def _fill_account_card(self, account: Dict):
+        """Set the account's values on its card."""
+        refs = self._card_refs_by_id[account['id']]
+        
+        refs["icon"].name = _TYPE_ICONS.get(account['type'], ft.Icons.SHOW_CHART)
+        refs["name"].value = account['name']
+        refs["details"].value = account['details_line']
+        refs["broker"].value = account['broker_line']
+    
+    def _on_edit_click(self, e):
+        """Edit the account whose card button was clicked."""
+        self.edit_account(self._account_by_id[e.control.data])
+    
+    def _on_delete_click(self, e):
+        """Delete the account whose card button was clicked."""
+        self.delete_account(self._account_by_id[e.control.data])
     
     def update_stats(self, account_count: int):
         """Update statistics display."""
@@ -526,52 +680,30 @@ class DashboardView:
     
     def show_create_account_dialog(self):
         """Show the create account dialog."""
-        dialog = CreateAccountDialog(self.page, self.refresh_accounts)
+        dialog = CreateAccountDialog(self.page, self.on_accounts_changed, self.app.toast)
         dialog.show()
     
     def edit_account(self, account: Dict):
         """Edit an existing account."""
         # TODO: Implement edit functionality
-        self.page.snack_bar = ft.SnackBar(
-            content=ft.Text(f"Edit functionality coming soon for: {account['name']}"),
-            bgcolor=COLORS["warning"]
-        )
-        self.page.snack_bar.open = True
-        self.page.update()
+        self.show_message(f"Edit functionality coming soon for: {account['name']}", COLORS["warning"])
     
     def delete_account(self, account: Dict):
         """Delete an account."""
         # TODO: Implement delete with confirmation
-        self.page.snack_bar = ft.SnackBar(
-            content=ft.Text(f"Delete functionality coming soon for: {account['name']}"),
-            bgcolor=COLORS["warning"]
-        )
-        self.page.snack_bar.open = True
-        self.page.update()
+        self.show_message(f"Delete functionality coming soon for: {account['name']}", COLORS["warning"])
     
     def handle_navigation(self, e):
         """Handle navigation rail selection."""
         index = e.control.selected_index
-        views = ["Dashboard", "Stocks & ETFs", "Crypto", "Transactions", "Analytics"]
-        
         if index > 0:
-            # Show coming soon message for other views
-            self.page.snack_bar = ft.SnackBar(
-                content=ft.Text(f"{views[index]} view coming soon!"),
-                bgcolor=COLORS["warning"]
-            )
-            self.page.snack_bar.open = True
-            self.page.update()
-            
-            # Reset to dashboard
-            e.control.selected_index = 0
-            self.page.update()
+            with self.batch_update():
+                # Show coming soon message for other views
+                self.show_message(f"{_NAV_DESTINATIONS[index][2]} view coming soon!", COLORS["warning"])
+                
+                # Reset to dashboard
+                e.control.selected_index = 0
     
     def show_settings(self):
         """Show settings dialog."""
-        self.page.snack_bar = ft.SnackBar(
-            content=ft.Text("Settings coming soon!"),
-            bgcolor=COLORS["warning"]
-        )
-        self.page.snack_bar.open = True
-        self.page.update()
\ No newline at end of file
+        self.show_message("Settings coming soon!", COLORS["warning"])
\ No newline at end of file
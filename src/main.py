@@ -3,6 +3,7 @@ Main entry point for the Portfolio Tracker application.
 Handles authentication and navigation between views.
 """
 
+import asyncio
 import sys
 import os
 from pathlib import Path
@@ -12,7 +13,8 @@ project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
 import flet as ft
-from typing import Optional
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List, Dict, Optional
 
 from src.utils.config import get_config, COLORS
 from src.utils.crypto import get_security_manager
@@ -59,7 +61,7 @@ class AuthenticationView:
             focused_border_color=COLORS["primary"],
             cursor_color=COLORS["primary"],
             selection_color=COLORS["primary"],
-            on_submit=lambda _: self.handle_submit() if not is_first_run else None
+            on_submit=self.handle_submit if not is_first_run else None
         )
         
         # Confirm password field (only for first run)
@@ -72,7 +74,7 @@ class AuthenticationView:
             cursor_color=COLORS["primary"],
             selection_color=COLORS["primary"],
             visible=is_first_run,
-            on_submit=lambda _: self.handle_submit() if is_first_run else None
+            on_submit=self.handle_submit if is_first_run else None
         )
         
         # Error text
@@ -96,7 +98,7 @@ class AuthenticationView:
             text="Create Master Password" if is_first_run else "Unlock",
             bgcolor=COLORS["primary"],
             color=COLORS["on_primary"],
-            on_click=lambda _: self.handle_submit(),
+            on_click=self.handle_submit,
             width=200,
             height=45
         )
@@ -162,8 +164,12 @@ class AuthenticationView:
             bgcolor=COLORS["background"]
         )
     
-    def handle_submit(self):
-        """Handle password submission."""
+    async def handle_submit(self, e=None):
+        """
+        Handle password submission.
+        Hashing and database work run in worker threads so the UI stays
+        responsive; the database is only opened once the password is accepted.
+        """
         password = self.password_field.value
         
         if not password:
@@ -182,33 +188,27 @@ class AuthenticationView:
                 self.show_error(f"Password must be at least {get_config().PASSWORD_MIN_LENGTH} characters")
                 return
             
-            # Initialize master password
-            if self.security.initialize_master_password(password):
-                # Initialize database
-                db = get_db_manager()
-                if db.initialize(check_auth=False):
-                    self.on_success()
-                else:
-                    self.show_error("Failed to initialize database")
-            else:
+            # Initialize master password, then the database
+            if not await asyncio.to_thread(self.security.initialize_master_password, password):
                 self.show_error("Password does not meet requirements")
-        else:
-            # Authenticate existing password
-            if self.security.authenticate(password):
-                # Initialize database
-                db = get_db_manager()
-                if db.initialize():
-                    self.on_success()
-                else:
-                    self.show_error("Failed to connect to database")
+            elif not await asyncio.to_thread(get_db_manager().initialize, check_auth=False):
+                self.show_error("Failed to initialize database")
             else:
+                await self.on_success()
+        else:
+            # Authenticate existing password; the database opens only after
+            if not await asyncio.to_thread(self.security.authenticate, password):
                 self.show_error("Invalid password")
+            elif not await asyncio.to_thread(get_db_manager().initialize):
+                self.show_error("Failed to connect to database")
+            else:
+                await self.on_success()
     
     def show_error(self, message: str):
         """Display error message."""
         self.error_text.value = message
         self.error_text.visible = True
-        self.page.update()
+        self.error_text.update()
 
 
 class PortfolioTrackerApp:
@@ -233,6 +233,18 @@ class PortfolioTrackerApp:
         self.dashboard_view = None
         self.current_view = None
         
+        # Dashboard app bar and navigation rail, kept across logins
+        self.dashboard_chrome: Dict[str, ft.Control] = {}
+        
+        # One notification bar shared by every view; toast() refills it
+        self._snackbar_text = ft.Text("")
+        self._snackbar = ft.SnackBar(content=self._snackbar_text)
+        self.page.overlay.append(self._snackbar)
+        
+        # Dashboard data loaded in the background while the view is built
+        self._prefetch_executor = ThreadPoolExecutor(max_workers=1)
+        self._accounts_prefetch: Optional[Future] = None
+        
         # Initialize
         self.initialize()
     
@@ -245,6 +257,7 @@ class PortfolioTrackerApp:
             # Try to initialize database
             if self.db.initialize():
                 self.show_dashboard()
+                self.page.run_task(self.dashboard_view.refresh_accounts_async)
             else:
                 self.show_auth_view()
     
@@ -258,9 +271,28 @@ class PortfolioTrackerApp:
         self.page.views.append(self.auth_view.build())
         self.page.update()
     
-    def on_auth_success(self):
+    async def on_auth_success(self):
         """Handle successful authentication."""
+        # Overlap the accounts query with building the dashboard
+        self._accounts_prefetch = self._prefetch_executor.submit(self.db.get_accounts)
         self.show_dashboard()
+        await self.dashboard_view.refresh_accounts_async()
+    
+    def take_accounts_prefetch(self) -> Optional["Future[List[Dict]]"]:
+        """Hand over the pending accounts prefetch, if any; it is used once."""
+        prefetch, self._accounts_prefetch = self._accounts_prefetch, None
+        return prefetch
+    
+    def toast(self, message: str, color: str, update: bool = True):
+        """
+        Show a notification in the shared snack bar.
+        Pass update=False when the caller sends the page update itself.
+        """
+        self._snackbar_text.value = message
+        self._snackbar.bgcolor = color
+        self._snackbar.open = True
+        if update:
+            self._snackbar.update()
     
     def show_dashboard(self):
         """Show main dashboard."""
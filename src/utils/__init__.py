@@ -1 +1,14 @@
-# Auto-generated __init__.py
+"""Configuration and security utilities."""
+
+from src._lazy import lazy_exports
+
+__getattr__, __all__ = lazy_exports(__name__, {
+    'AppConfig': '.config',
+    'get_config': '.config',
+    'COLORS': '.config',
+    'SecurityManager': '.crypto',
+    'SecurityError': '.crypto',
+    'get_security_manager': '.crypto',
+    'json_dumps': '.serialization',
+    'json_loads': '.serialization',
+})
@@ -5,6 +5,7 @@ Handles app settings, constants, and environment variables.
 
 import os
 from pathlib import Path
+from types import MappingProxyType
 from typing import Optional
 
 try:
@@ -30,11 +31,19 @@ class AppConfig(BaseSettings):
     CACHE_DIR: Optional[Path] = None
     BACKUP_DIR: Optional[Path] = None
     LOG_DIR: Optional[Path] = None
+    AUTH_FILE: Optional[Path] = None
     
     # Database settings
     DB_NAME: str = "portfolio.db"
     DB_BACKUP_COUNT: int = 5
     DB_WAL_MODE: bool = True
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_PAGE_SIZE: int = 8192  # Bytes, applied to new databases only
+    DB_CACHE_SIZE_KB: int = 65536  # 64MB page cache per connection
+    DB_BUSY_TIMEOUT_SECONDS: int = 30
+    DB_WAL_AUTOCHECKPOINT_PAGES: int = 1000
+    DB_JOURNAL_SIZE_LIMIT: int = 67_108_864  # 64MB
     
     # Security settings
     PASSWORD_MIN_LENGTH: int = 8
@@ -73,23 +82,35 @@ class AppConfig(BaseSettings):
             self.BACKUP_DIR = self.DATA_DIR / "backups"
         if self.LOG_DIR is None:
             self.LOG_DIR = self.DATA_DIR / "logs"
+        if self.AUTH_FILE is None:
+            self.AUTH_FILE = self.DATA_DIR / ".auth"
     
     def ensure_directories(self):
-        """Create all necessary directories if they don't exist."""
-        directories = [
-            self.DATA_DIR,
-            self.DB_PATH.parent if self.DB_PATH else None,
-            self.CACHE_DIR,
-            self.BACKUP_DIR,
-            self.LOG_DIR
+        """
+        Create all necessary directories if they don't exist.
+        Only the deepest directories are created explicitly; makedirs
+        creates their parents, such as DATA_DIR, along the way.
+        """
+        directories = {
+            directory for directory in (
+                self.DATA_DIR,
+                self.DB_PATH.parent if self.DB_PATH else None,
+                self.CACHE_DIR,
+                self.BACKUP_DIR,
+                self.LOG_DIR
+            )
+            if directory
+        }
+        leaves = [
+            directory for directory in directories
+            if not any(directory in other.parents for other in directories)
         ]
         
-        for directory in directories:
-            if directory:
-                try:
-                    directory.mkdir(parents=True, exist_ok=True)
-                except Exception as e:
-                    print(f"Warning: Could not create directory {directory}: {e}")
+        for directory in leaves:
+            try:
+                os.makedirs(directory, exist_ok=True)
+            except Exception as e:
+                print(f"Warning: Could not create directory {directory}: {e}")
     
     def get_db_url(self, encrypted: bool = True) -> str:
         """Get the database URL for SQLAlchemy."""
@@ -101,23 +122,19 @@ _config_instance: Optional[AppConfig] = None
 
 
 def get_config() -> AppConfig:
-    """Get or create the configuration singleton."""
+    """
+    Get or create the configuration singleton.
+    Directories are created by the components that use them, see
+    AppConfig.ensure_directories.
+    """
     global _config_instance
     if _config_instance is None:
         _config_instance = AppConfig()
-        _config_instance.ensure_directories()
     return _config_instance
 
-
-# Convenience constants
-try:
-    config = get_config()
-except Exception:
-    # Fallback config for initial import
-    config = None
-
-# UI Color scheme (Material Design 3)
-COLORS = {
+# UI Color scheme (Material Design 3), read-only; keys are string
+# literals, so lookups compare interned strings by identity
+COLORS = MappingProxyType({
     "primary": "#6750A4",
     "on_primary": "#FFFFFF",
     "secondary": "#625B71",
@@ -133,4 +150,4 @@ COLORS = {
     "outline": "#938F99",
     "success": "#4CAF50",
     "warning": "#FF9800",
-}
\ No newline at end of file
+})
\ No newline at end of file
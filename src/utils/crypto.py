@@ -3,20 +3,32 @@ Security and encryption module for the Portfolio Tracker.
 Handles master password, database encryption, and secure storage.
 """
 
+import io
 import os
 import base64
 import hashlib
-import json
-from typing import Optional, Tuple, Any
-from datetime import datetime, timedelta
+import secrets
+import struct
+import time
+from typing import Optional, Tuple, Any, List, BinaryIO, Union
+from datetime import datetime
 from pathlib import Path
 
 import bcrypt
-from cryptography.fernet import Fernet
+from cryptography.fernet import Fernet, InvalidToken
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 
 from src.utils.config import get_config
+from src.utils.serialization import json_dumps, json_loads
+
+
+# Streaming file encryption format: magic, then length-prefixed Fernet
+# tokens whose plaintext starts with the chunk index and a final-chunk flag
+STREAM_MAGIC = b"PTS1"
+STREAM_CHUNK_SIZE = 1 << 20  # 1MB
+STREAM_TOKEN_LENGTH = struct.Struct('>I')
+STREAM_CHUNK_HEADER = struct.Struct('>Q?')
 
 
 class SecurityManager:
@@ -24,11 +36,34 @@ class SecurityManager:
     
     def __init__(self):
         self.config = get_config()
-        self._master_key: Optional[bytes] = None
+        # Data, database, cache, backup and log directories; the database
+        # manager builds on this instance too
+        self.config.ensure_directories()
+        # Mutable so logout can overwrite it in place
+        self._master_key: Optional[bytearray] = None
         self._cipher: Optional[Fernet] = None
-        self._session_expiry: Optional[datetime] = None
-        self._auth_file = self.config.DATA_DIR / ".auth"
-        
+        # time.monotonic() deadline, unaffected by wall clock changes
+        self._session_expiry: Optional[float] = None
+        self._auth_file = self.config.AUTH_FILE
+        # Parsed auth file and the modification time it was read at
+        self._auth_cache: Optional[Tuple[int, dict]] = None
+        # Whether the auth file exists; None until first checked
+        self._auth_exists: Optional[bool] = None
+        self._check_crypto_backend()
+    
+    @staticmethod
+    def _check_crypto_backend():
+        """
+        Warn if OpenSSL's hardware AES support may be disabled.
+        Fernet runs on OpenSSL's EVP AES, which uses AES-NI unless the
+        OPENSSL_ia32cap override masks it out.
+        """
+        if os.environ.get("OPENSSL_ia32cap"):
+            print(
+                "Warning: OPENSSL_ia32cap is set; hardware AES acceleration "
+                "may be disabled and encryption will be slower"
+            )
+    
     def derive_key(self, password: str, salt: bytes) -> bytes:
         """Derive an encryption key from password using PBKDF2."""
         kdf = PBKDF2HMAC(
@@ -62,7 +97,7 @@ class SecurityManager:
                 return False
             
             # Generate salt for key derivation
-            salt = os.urandom(16)
+            salt = secrets.token_bytes(16)
             
             # Hash password for verification
             password_hash = self.hash_password(password)
@@ -77,21 +112,13 @@ class SecurityManager:
             
             # Save auth file (this itself should be protected)
             self._auth_file.parent.mkdir(parents=True, exist_ok=True)
-            with open(self._auth_file, 'w') as f:
-                json.dump(auth_data, f)
-            
-            # Set file permissions (Windows/Unix compatible)
-            try:
-                os.chmod(self._auth_file, 0o600)
-            except:
-                pass  # Windows might not support chmod
+            self._write_auth_file(json_dumps(auth_data))
+            self._auth_exists = True
             
             # Initialize encryption
-            self._master_key = self.derive_key(password, salt)
+            self._master_key = bytearray(self.derive_key(password, salt))
             self._cipher = Fernet(self._master_key)
-            self._session_expiry = datetime.now() + timedelta(
-                minutes=self.config.SESSION_TIMEOUT_MINUTES
-            )
+            self._session_expiry = self._new_session_expiry()
             
             return True
             
@@ -105,12 +132,14 @@ class SecurityManager:
         Returns True if successful, False otherwise.
         """
         try:
-            if not self._auth_file.exists():
+            if self.is_first_run():
                 return False
             
             # Load auth data
-            with open(self._auth_file, 'r') as f:
-                auth_data = json.load(f)
+            try:
+                auth_data = self._load_auth_data()
+            except FileNotFoundError:
+                return False
             
             # Verify password
             password_hash = base64.b64decode(auth_data["password_hash"])
@@ -119,11 +148,9 @@ class SecurityManager:
             
             # Initialize encryption
             salt = base64.b64decode(auth_data["salt"])
-            self._master_key = self.derive_key(password, salt)
+            self._master_key = bytearray(self.derive_key(password, salt))
             self._cipher = Fernet(self._master_key)
-            self._session_expiry = datetime.now() + timedelta(
-                minutes=self.config.SESSION_TIMEOUT_MINUTES
-            )
+            self._session_expiry = self._new_session_expiry()
             
             return True
             
@@ -131,26 +158,77 @@ class SecurityManager:
             print(f"Authentication failed: {e}")
             return False
     
+    def _write_auth_file(self, data: bytes):
+        """
+        Write the auth file atomically, owner-only from the start.
+        A crash leaves either the old file or the new one, never a partial one.
+        """
+        temp_path = self._auth_file.with_suffix('.tmp')
+        try:
+            # Permissions are set at creation (Windows ignores all but read-only)
+            fd = os.open(
+                temp_path,
+                os.O_CREAT | os.O_WRONLY | os.O_TRUNC | getattr(os, 'O_BINARY', 0),
+                0o600
+            )
+            try:
+                os.write(fd, data)
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+            os.replace(temp_path, self._auth_file)
+        except BaseException:
+            temp_path.unlink(missing_ok=True)
+            raise
+    
+    def _load_auth_data(self) -> dict:
+        """
+        Read the auth file, reusing the parsed contents while it is unchanged.
+        Raises FileNotFoundError if there is no auth file.
+        """
+        mtime_ns = self._auth_file.stat().st_mtime_ns
+        if self._auth_cache is not None and self._auth_cache[0] == mtime_ns:
+            return self._auth_cache[1]
+        
+        auth_data = json_loads(self._auth_file.read_bytes())
+        self._auth_cache = (mtime_ns, auth_data)
+        return auth_data
+    
     def is_authenticated(self) -> bool:
         """Check if user is currently authenticated and session is valid."""
         if self._cipher is None or self._session_expiry is None:
             return False
         
-        if datetime.now() > self._session_expiry:
+        if time.monotonic() > self._session_expiry:
             self.logout()
             return False
         
         return True
     
+    def _new_session_expiry(self) -> float:
+        """Get the deadline for a session starting or extended now."""
+        return time.monotonic() + self.config.SESSION_TIMEOUT_MINUTES * 60
+    
+    def get_cipher(self) -> Optional[Fernet]:
+        """
+        Get the cipher keyed for the current session.
+        Returns None when not authenticated. Lets bulk callers check the
+        session once instead of on every encrypt_data/decrypt_data call.
+        """
+        if not self.is_authenticated():
+            return None
+        return self._cipher
+    
     def extend_session(self):
         """Extend the current session timeout."""
         if self.is_authenticated():
-            self._session_expiry = datetime.now() + timedelta(
-                minutes=self.config.SESSION_TIMEOUT_MINUTES
-            )
+            self._session_expiry = self._new_session_expiry()
     
     def logout(self):
         """Clear authentication state."""
+        if self._master_key is not None:
+            # Wipe our copy of the key rather than waiting for it to be freed
+            self._master_key[:] = bytes(len(self._master_key))
         self._master_key = None
         self._cipher = None
         self._session_expiry = None
@@ -160,12 +238,14 @@ class SecurityManager:
         if not self.is_authenticated():
             raise SecurityError("Not authenticated")
         
-        if isinstance(data, str):
-            data_bytes = data.encode()
-        elif isinstance(data, bytes):
+        # isinstance rather than match: compile_cython.py builds this module
+        # and the pinned Cython 3.0 cannot compile match statements
+        if isinstance(data, bytes):
             data_bytes = data
+        elif isinstance(data, str):
+            data_bytes = data.encode()
         else:
-            data_bytes = json.dumps(data).encode()
+            data_bytes = json_dumps(data)
         
         return self._cipher.encrypt(data_bytes)
     
@@ -176,45 +256,169 @@ class SecurityManager:
         
         return self._cipher.decrypt(encrypted_data)
     
-    def encrypt_file(self, file_path: Path) -> Path:
-        """Encrypt a file and return path to encrypted file."""
-        if not self.is_authenticated():
+    def decrypt_batch(self, tokens: List[Union[bytes, str]]) -> List[Optional[bytes]]:
+        """
+        Decrypt many tokens with a single session check and cipher lookup.
+        Tokens that fail to authenticate yield None instead of raising.
+        """
+        cipher = self.get_cipher()
+        if cipher is None:
             raise SecurityError("Not authenticated")
         
-        with open(file_path, 'rb') as f:
-            encrypted_data = self.encrypt_data(f.read())
+        decrypt = cipher.decrypt
+        results = []
+        for token in tokens:
+            try:
+                results.append(decrypt(token))
+            except InvalidToken:
+                results.append(None)
+        return results
+    
+    def encrypt_file(self, file_path: Path) -> Path:
+        """
+        Encrypt a file and return path to encrypted file.
+        Uses the chunked format of encrypt_file_streaming, so the file is
+        never held in memory as a whole.
+        """
+        return self.encrypt_file_streaming(file_path)
+    
+    def decrypt_file(self, encrypted_path: Path) -> bytes:
+        """
+        Decrypt a file and return its contents.
+        Reads both the chunked format and single-token files written by
+        earlier versions.
+        """
+        cipher = self.get_cipher()
+        if cipher is None:
+            raise SecurityError("Not authenticated")
         
+        with open(encrypted_path, 'rb') as source:
+            if source.read(len(STREAM_MAGIC)) != STREAM_MAGIC:
+                # Fernet tokens never start with the stream magic
+                source.seek(0)
+                return cipher.decrypt(source.read())
+            
+            plaintext = io.BytesIO()
+            self._decrypt_chunks(cipher, source, plaintext)
+            return plaintext.getvalue()
+    
+    def encrypt_file_streaming(self, file_path: Path,
+                               chunk_size: int = STREAM_CHUNK_SIZE) -> Path:
+        """
+        Encrypt a file chunk by chunk and return path to encrypted file.
+        Memory use is bounded by chunk_size. Each chunk is a Fernet token
+        carrying its index and a final-chunk flag, so reordered or
+        truncated files fail to decrypt. The output is written atomically.
+        """
         encrypted_path = file_path.with_suffix(file_path.suffix + '.enc')
-        with open(encrypted_path, 'wb') as f:
-            f.write(encrypted_data)
+        with open(file_path, 'rb') as source:
+            return self.encrypt_stream(source, encrypted_path, chunk_size)
+    
+    def encrypt_stream(self, source: BinaryIO, encrypted_path: Path,
+                       chunk_size: int = STREAM_CHUNK_SIZE) -> Path:
+        """
+        Encrypt a readable binary stream into encrypted_path.
+        Same format as encrypt_file_streaming, so decrypt_file_streaming
+        reads it back; lets callers encrypt data that never touches disk.
+        """
+        cipher = self.get_cipher()
+        if cipher is None:
+            raise SecurityError("Not authenticated")
+        
+        temp_path = encrypted_path.with_suffix(encrypted_path.suffix + '.tmp')
+        try:
+            with open(temp_path, 'wb') as dest:
+                dest.write(STREAM_MAGIC)
+                index = 0
+                chunk = source.read(chunk_size)
+                while True:
+                    next_chunk = source.read(chunk_size)
+                    is_last = not next_chunk
+                    token = cipher.encrypt(STREAM_CHUNK_HEADER.pack(index, is_last) + chunk)
+                    dest.write(STREAM_TOKEN_LENGTH.pack(len(token)))
+                    dest.write(token)
+                    if is_last:
+                        break
+                    chunk = next_chunk
+                    index += 1
+            os.replace(temp_path, encrypted_path)
+        except BaseException:
+            temp_path.unlink(missing_ok=True)
+            raise
         
         return encrypted_path
     
-    def decrypt_file(self, encrypted_path: Path) -> bytes:
-        """Decrypt a file and return its contents."""
-        if not self.is_authenticated():
+    def decrypt_file_streaming(self, encrypted_path: Path, output_path: Path) -> Path:
+        """
+        Decrypt a file written by encrypt_file_streaming into output_path.
+        The partial output is removed if the file fails to authenticate.
+        """
+        cipher = self.get_cipher()
+        if cipher is None:
             raise SecurityError("Not authenticated")
         
-        with open(encrypted_path, 'rb') as f:
-            encrypted_data = f.read()
+        try:
+            with open(encrypted_path, 'rb') as source, open(output_path, 'wb') as dest:
+                if source.read(len(STREAM_MAGIC)) != STREAM_MAGIC:
+                    raise SecurityError("Not a streaming-encrypted file")
+                self._decrypt_chunks(cipher, source, dest)
+        except BaseException:
+            output_path.unlink(missing_ok=True)
+            raise
         
-        return self.decrypt_data(encrypted_data)
+        return output_path
+    
+    @staticmethod
+    def _decrypt_chunks(cipher: Fernet, source: BinaryIO, dest: BinaryIO):
+        """Decrypt the chunk tokens that follow the stream magic into dest."""
+        expected_index = 0
+        while True:
+            length_bytes = source.read(STREAM_TOKEN_LENGTH.size)
+            if len(length_bytes) != STREAM_TOKEN_LENGTH.size:
+                raise SecurityError("Encrypted file is truncated")
+            token = source.read(STREAM_TOKEN_LENGTH.unpack(length_bytes)[0])
+            chunk = cipher.decrypt(token)
+            
+            index, is_last = STREAM_CHUNK_HEADER.unpack_from(chunk)
+            if index != expected_index:
+                raise SecurityError("Encrypted file chunks are out of order")
+            dest.write(chunk[STREAM_CHUNK_HEADER.size:])
+            
+            if is_last:
+                if source.read(1):
+                    raise SecurityError("Unexpected data after final chunk")
+                break
+            expected_index += 1
     
     def _validate_password_strength(self, password: str) -> bool:
         """Validate password meets minimum requirements."""
         if len(password) < self.config.PASSWORD_MIN_LENGTH:
             return False
         
-        # Check for at least one digit, one letter, and one special character
-        has_digit = any(c.isdigit() for c in password)
-        has_letter = any(c.isalpha() for c in password)
-        has_special = any(not c.isalnum() for c in password)
+        # Check for at least one digit, one letter, and one special character,
+        # in a single pass that stops once all three are seen
+        has_digit = has_letter = has_special = False
+        for c in password:
+            if c.isdigit():
+                has_digit = True
+            elif c.isalpha():
+                has_letter = True
+            elif not c.isalnum():
+                has_special = True
+            if has_digit and has_letter and has_special:
+                return True
         
-        return has_digit and has_letter and has_special
+        return False
     
     def is_first_run(self) -> bool:
-        """Check if this is the first run (no auth file exists)."""
-        return not self._auth_file.exists()
+        """
+        Check if this is the first run (no auth file exists).
+        The file is only created by initialize_master_password, so the
+        answer is looked up once and then kept.
+        """
+        if self._auth_exists is None:
+            self._auth_exists = self._auth_file.exists()
+        return not self._auth_exists
     
     def get_password_requirements(self) -> str:
         """Get password requirements as a string."""
@@ -0,0 +1,23 @@
+"""
+Filesystem path helpers.
+Kept free of third-party imports so setup.py can use them before dependencies are installed.
+"""
+
+import os
+from pathlib import Path
+
+
+def find_missing_files(file_paths):
+    """Return the paths that don't exist, listing each parent directory only once"""
+    listings = {}
+    for parent in {Path(file_path).parent for file_path in file_paths}:
+        try:
+            with os.scandir(parent) as entries:
+                listings[parent] = {entry.name for entry in entries if entry.is_file()}
+        except OSError:
+            listings[parent] = set()
+    
+    return [
+        file_path for file_path in file_paths
+        if Path(file_path).name not in listings[Path(file_path).parent]
+    ]
@@ -0,0 +1,36 @@
+"""
+JSON serialization helpers.
+Uses orjson when it is installed and falls back to the standard library.
+"""
+
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # Optional speedup
+    orjson = None
+
+# Raised by json_loads for either backend (orjson's error subclasses it)
+JSONDecodeError = json.JSONDecodeError
+
+
+def json_dumps(data: Any) -> bytes:
+    """Serialize data to UTF-8 encoded JSON bytes."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(data)
+        except TypeError:
+            # Values orjson rejects (e.g. non-string keys, integers over 64 bits)
+            pass
+    return json.dumps(data).encode()
+
+
+def json_loads(data: Union[bytes, str]) -> Any:
+    """
+    Parse JSON from bytes or str.
+    Raises JSONDecodeError.
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
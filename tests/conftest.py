@@ -0,0 +1,39 @@
+"""
+Shared fixtures for the Portfolio Tracker tests.
+Points DATA_DIR at a temporary directory before any src module reads the
+configuration, so tests never touch the user's real data.
+"""
+
+import os
+import tempfile
+
+os.environ["DATA_DIR"] = tempfile.mkdtemp(prefix="portfolio_tracker_tests_")
+
+import pytest
+
+from src.utils.config import get_config
+from src.utils.crypto import SecurityManager
+from src.core.database import DatabaseManager
+
+
+TEST_PASSWORD = "Correct-Horse-9"
+
+
+@pytest.fixture
+def security() -> SecurityManager:
+    """A security manager with a freshly created master password."""
+    manager = SecurityManager()
+    assert manager.initialize_master_password(TEST_PASSWORD)
+    return manager
+
+
+@pytest.fixture
+def db(security, tmp_path, monkeypatch) -> DatabaseManager:
+    """An initialized database manager on its own database file."""
+    monkeypatch.setattr(get_config(), "DB_PATH", tmp_path / "portfolio.db")
+    manager = DatabaseManager()
+    manager.security = security
+    assert manager.initialize()
+    yield manager
+    manager.engine.dispose()
+    manager.read_engine.dispose()
@@ -0,0 +1,104 @@
+"""
+Tests for the chunked (PTS1) file encryption format.
+"""
+
+import os
+
+import pytest
+
+from src.utils.crypto import (
+    STREAM_MAGIC, STREAM_TOKEN_LENGTH, SecurityError
+)
+
+
+CHUNK_SIZE = 1024
+
+
+def _write_encrypted(security, tmp_path, data: bytes):
+    """Encrypt data through a file and return the encrypted path."""
+    source = tmp_path / "plain.bin"
+    source.write_bytes(data)
+    return security.encrypt_file_streaming(source, chunk_size=CHUNK_SIZE)
+
+
+def _split_tokens(encrypted: bytes):
+    """Split an encrypted file into its length-prefixed tokens."""
+    assert encrypted.startswith(STREAM_MAGIC)
+    tokens = []
+    offset = len(STREAM_MAGIC)
+    while offset < len(encrypted):
+        (length,) = STREAM_TOKEN_LENGTH.unpack_from(encrypted, offset)
+        offset += STREAM_TOKEN_LENGTH.size
+        tokens.append(encrypted[offset:offset + length])
+        offset += length
+    return tokens
+
+
+def _join_tokens(tokens) -> bytes:
+    """Reassemble tokens into an encrypted file."""
+    return STREAM_MAGIC + b"".join(
+        STREAM_TOKEN_LENGTH.pack(len(token)) + token for token in tokens
+    )
+
+
+@pytest.mark.parametrize("size", [0, 1, CHUNK_SIZE, CHUNK_SIZE * 3 + 7])
+def test_round_trip(security, tmp_path, size):
+    data = os.urandom(size)
+    encrypted_path = _write_encrypted(security, tmp_path, data)
+    
+    output = security.decrypt_file_streaming(encrypted_path, tmp_path / "out.bin")
+    assert output.read_bytes() == data
+    assert security.decrypt_file(encrypted_path) == data
+
+
+def test_encrypt_file_uses_chunked_format(security, tmp_path):
+    source = tmp_path / "plain.bin"
+    source.write_bytes(b"portfolio")
+    
+    encrypted_path = security.encrypt_file(source)
+    assert encrypted_path.read_bytes().startswith(STREAM_MAGIC)
+    assert security.decrypt_file(encrypted_path) == b"portfolio"
+
+
+def test_truncated_file_is_rejected(security, tmp_path):
+    encrypted_path = _write_encrypted(security, tmp_path, os.urandom(CHUNK_SIZE * 3))
+    tokens = _split_tokens(encrypted_path.read_bytes())
+    encrypted_path.write_bytes(_join_tokens(tokens[:-1]))
+    
+    output_path = tmp_path / "out.bin"
+    with pytest.raises(SecurityError):
+        security.decrypt_file_streaming(encrypted_path, output_path)
+    assert not output_path.exists()
+
+
+def test_reordered_chunks_are_rejected(security, tmp_path):
+    encrypted_path = _write_encrypted(security, tmp_path, os.urandom(CHUNK_SIZE * 3))
+    tokens = _split_tokens(encrypted_path.read_bytes())
+    tokens[0], tokens[1] = tokens[1], tokens[0]
+    encrypted_path.write_bytes(_join_tokens(tokens))
+    
+    with pytest.raises(SecurityError):
+        security.decrypt_file(encrypted_path)
+
+
+def test_data_after_final_chunk_is_rejected(security, tmp_path):
+    encrypted_path = _write_encrypted(security, tmp_path, os.urandom(CHUNK_SIZE))
+    encrypted_path.write_bytes(encrypted_path.read_bytes() + b"\0")
+    
+    with pytest.raises(SecurityError):
+        security.decrypt_file_streaming(encrypted_path, tmp_path / "out.bin")
+
+
+def test_missing_magic_is_rejected(security, tmp_path):
+    encrypted_path = tmp_path / "plain.enc"
+    encrypted_path.write_bytes(b"not an encrypted file")
+    
+    with pytest.raises(SecurityError):
+        security.decrypt_file_streaming(encrypted_path, tmp_path / "out.bin")
+
+
+def test_decrypt_file_reads_single_token_files(security, tmp_path):
+    legacy_path = tmp_path / "legacy.enc"
+    legacy_path.write_bytes(security.encrypt_data(b"written by 1.0"))
+    
+    assert security.decrypt_file(legacy_path) == b"written by 1.0"
@@ -0,0 +1,87 @@
+"""
+Tests for stored field formats and the 1.0 -> 1.1 data migration.
+"""
+
+import sqlite3
+
+from sqlalchemy import text
+
+from src.core.database import DB_VERSION
+
+
+def _execute(db, sql: str, params=()):
+    """Run raw SQL against the database file, bypassing the ORM."""
+    connection = sqlite3.connect(db.config.DB_PATH)
+    try:
+        with connection:
+            connection.execute(sql, params)
+    finally:
+        connection.close()
+
+
+def _stored_version(db) -> str:
+    """Read the raw db_version value; get_setting would parse it as JSON."""
+    connection = sqlite3.connect(db.config.DB_PATH)
+    try:
+        row = connection.execute(
+            "SELECT value FROM settings WHERE key = 'db_version'"
+        ).fetchone()
+    finally:
+        connection.close()
+    return row[0]
+
+
+def test_fields_route_on_token_prefix(db):
+    token = db.encrypt_field({"broker": "IBKR"})
+    assert token.startswith(b"gAAAAA")
+    assert db.decrypt_field(token) == {"broker": "IBKR"}
+    
+    # Plain JSON, as stored while logged out, is parsed without decrypting
+    assert db.decrypt_field(b'{"broker": "IBKR"}') == {"broker": "IBKR"}
+    assert db.decrypt_fields([token, b'[1, 2]', None]) == [{"broker": "IBKR"}, [1, 2], None]
+
+
+def test_encrypted_setting_round_trip(db):
+    assert db.save_setting("api_key", "secret", encrypted=True)
+    assert db.get_setting("api_key") == "secret"
+    
+    assert db.save_setting("api_key", None, encrypted=True)
+    assert db.get_setting("api_key", "default") is None
+
+
+def test_legacy_hex_data_is_migrated(db):
+    account_id = db.create_account("Main", "stocks", broker="Broker")
+    
+    # Data as written by 1.0: hex-encoded Fernet tokens stored as text
+    metadata_hex = db.security.encrypt_data('{"created_via": "app"}').hex()
+    setting_hex = db.security.encrypt_data('"secret"').hex()
+    _execute(db, "UPDATE accounts SET metadata_encrypted = ? WHERE id = ?",
+             (metadata_hex, account_id))
+    _execute(db, "INSERT INTO settings (key, value, encrypted) VALUES (?, ?, 1)",
+             ("api_key", setting_hex))
+    _execute(db, "UPDATE settings SET value = '1.0' WHERE key = 'db_version'")
+    db._invalidate_setting()
+    
+    db._migrate()
+    
+    assert _stored_version(db) == DB_VERSION
+    assert db.get_setting("api_key") == "secret"
+    account = db.get_accounts()[0]
+    assert account["metadata"] == {"created_via": "app"}
+    with db.engine.connect() as connection:
+        stored_type = connection.execute(
+            text("SELECT typeof(metadata_encrypted) FROM accounts WHERE id = :id"),
+            {"id": account_id}
+        ).scalar()
+    assert stored_type == "blob"
+
+
+def test_missing_version_row_is_added_once(db, capsys):
+    _execute(db, "DELETE FROM settings WHERE key = 'db_version'")
+    db._invalidate_setting()
+    
+    db._migrate()
+    db._migrate()
+    
+    assert _stored_version(db) == DB_VERSION
+    assert capsys.readouterr().out.count("Database migrated") == 1
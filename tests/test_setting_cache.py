@@ -0,0 +1,60 @@
+"""
+Tests for the settings cache and its concurrency guards.
+"""
+
+import threading
+from contextlib import contextmanager
+
+
+def test_read_started_before_commit_does_not_cache_old_value(db, monkeypatch):
+    assert db.save_setting("theme", "old")
+    db._invalidate_setting("theme")
+    
+    reader_read = threading.Event()
+    writer_done = threading.Event()
+    read_results = []
+    readers = []
+    
+    real_readonly_session = db.get_readonly_session
+    real_session = db.get_session
+    
+    @contextmanager
+    def slow_readonly_session():
+        # The reader holds the old row until the writer has written through
+        with real_readonly_session() as session:
+            yield session
+        reader_read.set()
+        writer_done.wait(timeout=5)
+    
+    def reader():
+        read_results.append(db.get_setting("theme"))
+    
+    @contextmanager
+    def session_after_read():
+        # The writer has taken its ticket; let a cache miss read the old row
+        # before this write commits
+        readers.append(threading.Thread(target=reader))
+        readers[0].start()
+        assert reader_read.wait(timeout=5)
+        with real_session() as session:
+            yield session
+    
+    monkeypatch.setattr(db, "get_readonly_session", slow_readonly_session)
+    monkeypatch.setattr(db, "get_session", session_after_read)
+    
+    assert db.save_setting("theme", "new")
+    writer_done.set()
+    readers[0].join(timeout=5)
+    
+    monkeypatch.setattr(db, "get_readonly_session", real_readonly_session)
+    monkeypatch.setattr(db, "get_session", real_session)
+    
+    assert read_results == ["old"]
+    assert db._setting_cache.get("theme") == ("new", False)
+    assert db.get_setting("theme") == "new"
+
+
+def test_save_setting_writes_through(db):
+    assert db.save_setting("currency_primary", "USD")
+    assert db._setting_cache["currency_primary"] == ("USD", False)
+    assert db.get_setting("currency_primary") == "USD"